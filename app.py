@@ -1,23 +1,217 @@
 import asyncio
+import logging
+
+from aiohttp import web
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 
-from config import BOT_TOKEN
-from db.repo import init_db
+from config import (
+    BOT_TOKEN,
+    DB_PATH,
+    DB_READERS,
+    DB_PROFILE,
+    FINALIZE_GROUP_COMMIT,
+    FINALIZE_BATCH_SIZE,
+    FINALIZE_BATCH_MS,
+    PROGRESS_WRITE_BEHIND,
+    PROGRESS_FLUSH_MS,
+    PROGRESS_FLUSH_ROWS,
+    SUBMISSION_CACHE,
+    SUBMISSION_CACHE_NEGATIVE,
+    JOB_POOL_KIND,
+    JOB_POOL_WORKERS,
+    JOB_POOL_QUEUE,
+    RUN_MODE,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    TELEGRAM_API_URL,
+    OUTBOUND_SCHEDULER,
+    OUTBOUND_GLOBAL_RATE,
+    OUTBOUND_CHAT_RATE,
+    OUTBOUND_CHAT_BURST,
+    OUTBOUND_CHAT_LIMIT_EDITS,
+    OUTBOUND_MAX_RETRIES,
+    METRICS_HOST,
+    METRICS_PORT,
+    PROFILE_EVERY,
+    PROFILE_USER_ID,
+    PROFILE_TOP,
+    PROFILE_DUMP,
+)
+from db.repo import (
+    init_db,
+    open_db,
+    close_db,
+    enable_group_commit,
+    enable_progress_buffer,
+    enable_submission_cache,
+)
 from handlers import router as main_router
+from utils.jobs import configure_jobs, shutdown_jobs
+from ui.screens import warm_question_screens
+from utils.metrics import ApiMetricsMiddleware, HandlerMetricsMiddleware, start_metrics_server
+from utils.outbound import install_outbound
+from utils.profiling import configure_profiling
+from utils.signals import cancel_on_sigterm
 
+logger = logging.getLogger(__name__)
 
-async def main():
+# порт HTTP /metrics этого процесса (cluster.py сдвигает его для каждого воркера)
+metrics_port = METRICS_PORT
+# cluster.py прогоняет миграции один раз во фронте, воркеры только открывают БД
+migrate_db = True
+# общий лимит Bot API на этот процесс (cluster.py делит OUTBOUND_GLOBAL_RATE на воркеры)
+outbound_global_rate = OUTBOUND_GLOBAL_RATE
+_metrics_runner: web.AppRunner | None = None
+
+
+async def startup():
+    global _metrics_runner
+
+    await open_db(DB_PATH, readers=DB_READERS, profile=DB_PROFILE)
+    if migrate_db:
+        await init_db()
+    if FINALIZE_GROUP_COMMIT:
+        enable_group_commit(FINALIZE_BATCH_SIZE, FINALIZE_BATCH_MS)
+    if PROGRESS_WRITE_BEHIND:
+        enable_progress_buffer(PROGRESS_FLUSH_MS, PROGRESS_FLUSH_ROWS)
+    if SUBMISSION_CACHE:
+        await enable_submission_cache(SUBMISSION_CACHE_NEGATIVE)
+    configure_jobs(JOB_POOL_KIND, JOB_POOL_WORKERS, JOB_POOL_QUEUE)
+    warm_question_screens()
+    if metrics_port:
+        _metrics_runner = await start_metrics_server(METRICS_HOST, metrics_port)
+        logger.info("metrics on %s:%s/metrics", METRICS_HOST, metrics_port)
+
+
+async def shutdown():
+    global _metrics_runner
+
+    if _metrics_runner is not None:
+        await _metrics_runner.cleanup()
+        _metrics_runner = None
+    # close_db дописывает write-behind буфер и очередь group commit
+    shutdown_jobs()
+    await close_db()
+
+
+def create_bot() -> Bot:
     if not BOT_TOKEN:
         raise RuntimeError("BOT_TOKEN is empty. Put BOT_TOKEN into .env")
 
-    await init_db()
+    # свой адрес Bot API: локальный telegram-bot-api или фейковый сервер для нагрузочных тестов
+    if TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+        bot = Bot(token=BOT_TOKEN, session=session)
+    else:
+        bot = Bot(token=BOT_TOKEN)
 
-    bot = Bot(token=BOT_TOKEN)
+    if OUTBOUND_SCHEDULER:
+        install_outbound(
+            bot,
+            global_rate=outbound_global_rate,
+            chat_rate=OUTBOUND_CHAT_RATE,
+            chat_burst=OUTBOUND_CHAT_BURST,
+            chat_limit_edits=OUTBOUND_CHAT_LIMIT_EDITS,
+            max_retries=OUTBOUND_MAX_RETRIES,
+        )
+    # после планировщика: считаем каждую реальную попытку, включая повторы после 429
+    bot.session.middleware(ApiMetricsMiddleware())
+    return bot
+
+
+def build_dispatcher() -> Dispatcher:
     dp = Dispatcher()
+    dp.message.middleware(HandlerMetricsMiddleware())
+    dp.callback_query.middleware(HandlerMetricsMiddleware())
+    # профайлер висит всегда: включается из /profile, выключенный почти ничего не стоит
+    profiler = configure_profiling(PROFILE_EVERY, PROFILE_USER_ID, PROFILE_TOP, PROFILE_DUMP)
+    dp.message.middleware(profiler)
+    dp.callback_query.middleware(profiler)
     dp.include_router(main_router)
+    return dp
+
+
+async def run_polling(bot: Bot, dp: Dispatcher):
+    await startup()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await shutdown()
+
+
+def build_webhook_app(bot: Bot, dp: Dispatcher, set_webhook: bool = True) -> web.Application:
+    """
+    aiohttp-приложение для webhook-режима. Апдейт обрабатывается внутри запроса
+    (handle_in_background=False), поэтому при остановке aiohttp сначала дожидается
+    текущих апдейтов, и только потом on_cleanup закрывает БД.
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET or None,
+        handle_in_background=False,
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+
+    async def on_startup(_app: web.Application):
+        await startup()
+        if set_webhook and WEBHOOK_BASE_URL:
+            await bot.set_webhook(
+                WEBHOOK_BASE_URL.rstrip("/") + WEBHOOK_PATH,
+                secret_token=WEBHOOK_SECRET or None,
+            )
+
+    async def on_cleanup(_app: web.Application):
+        await shutdown()
+        await bot.session.close()
+
+    app.on_startup.insert(0, on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+async def run_webhook(
+    bot: Bot,
+    dp: Dispatcher,
+    host: str = WEBHOOK_HOST,
+    port: int = WEBHOOK_PORT,
+    set_webhook: bool = True,
+):
+    app = build_webhook_app(bot, dp, set_webhook=set_webhook)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info("webhook server on %s:%s%s", host, port, WEBHOOK_PATH)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def main():
+    bot = create_bot()
+    dp = build_dispatcher()
 
-    await dp.start_polling(bot)
+    if RUN_MODE == "webhook":
+        # polling ловит SIGTERM сам (start_polling), webhook — нет
+        cancel_on_sigterm()
+        await run_webhook(bot, dp)
+    else:
+        await run_polling(bot, dp)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
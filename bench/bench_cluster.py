@@ -0,0 +1,129 @@
+"""
+Нагрузочный тест multi-worker режима: фейковый Bot API + cluster.py
+с разным числом воркеров, пользователи проходят анкету целиком через фронт.
+
+    python -m bench.bench_cluster --users 200 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from aiohttp import ClientSession, web
+
+from bench.fake_bot_api import FakeBotAPI
+from bench.post_update import fake_callback, fake_message
+from survey.questions import SURVEY
+
+API_PORT = 8181
+FRONT_PORT = 8180
+BASE_PORT = 8190
+PATH = "/webhook"
+
+
+def survey_updates(user_id: int):
+    yield fake_message(user_id, "/start")
+    yield fake_callback(user_id, "lang:uz")
+    for i, q in enumerate(SURVEY):
+        yield fake_callback(user_id, f"ans:{i}:{user_id % len(q.options_uz)}")
+
+
+async def _wait_ready(session: ClientSession, url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as resp:
+                await resp.read()
+                return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} is not up")
+
+
+async def _drive(session: ClientSession, users: int, concurrency: int) -> int:
+    url = f"http://127.0.0.1:{FRONT_PORT}{PATH}"
+    sem = asyncio.Semaphore(concurrency)
+    sent = 0
+
+    async def one_user(user_id: int):
+        nonlocal sent
+        async with sem:
+            # апдейты одного пользователя — строго последовательно, как в Telegram
+            for update in survey_updates(user_id):
+                async with session.post(url, json=update) as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        raise RuntimeError(f"HTTP {resp.status} for user {user_id}")
+                sent += 1
+
+    await asyncio.gather(*(one_user(1000 + u) for u in range(users)))
+    return sent
+
+
+async def run_case(workers: int, users: int, concurrency: int):
+    api = FakeBotAPI()
+    runner = web.AppRunner(api.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", API_PORT).start()
+
+    tmp = tempfile.mkdtemp(prefix="bench_cluster_")
+    env = dict(
+        os.environ,
+        BOT_TOKEN="42:TEST",
+        TELEGRAM_API_URL=f"http://127.0.0.1:{API_PORT}",
+        DB_PATH=os.path.join(tmp, "bench.db"),
+        WORKERS=str(workers),
+        WORKER_BASE_PORT=str(BASE_PORT),
+        WEBHOOK_HOST="127.0.0.1",
+        WEBHOOK_PORT=str(FRONT_PORT),
+        WEBHOOK_PATH=PATH,
+        WEBHOOK_BASE_URL="",
+        WEBHOOK_SECRET="",
+        # меряем масштабирование воркеров, а не лимиты OutboundScheduler (1/с на чат, общий)
+        OUTBOUND_SCHEDULER="0",
+    )
+    proc = subprocess.Popen([sys.executable, "cluster.py"], env=env, stderr=subprocess.DEVNULL)
+
+    try:
+        async with ClientSession() as session:
+            for i in range(workers):
+                await _wait_ready(session, f"http://127.0.0.1:{BASE_PORT + i}/")
+            await _wait_ready(session, f"http://127.0.0.1:{FRONT_PORT}/")
+
+            t0 = time.perf_counter()
+            sent = await _drive(session, users, concurrency)
+            elapsed = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+        await runner.cleanup()
+
+    import sqlite3
+
+    con = sqlite3.connect(env["DB_PATH"])
+    saved = con.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+    con.close()
+
+    print(
+        f"workers={workers:<2} updates={sent:<6} {elapsed:7.2f}s  "
+        f"{sent / elapsed:8.0f} upd/s  submissions={saved}/{users}  api_calls={sum(api.calls.values())}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"cpu={os.cpu_count()} users={args.users} concurrency={args.concurrency}")
+    for workers in args.workers:
+        asyncio.run(run_case(workers, args.users, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Бенчмарк записи прогресса: N одновременных респондентов по M ответов,
+параллельно админ гоняет load_all_responses().
+
+    python -m bench.bench_db_writes --users 200 --answers 30
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from db import repo
+from survey.questions import SURVEY
+
+
+async def _respondent(user_id: int, answers_count: int):
+    answers = {}
+    for i in range(answers_count):
+        q = SURVEY[i % len(SURVEY)]
+        answers[q.key] = i % len(q.options_uz)
+        await repo.save_progress(user_id, "uz", i, answers, 1000 + user_id)
+
+
+async def _admin_scans(stop: asyncio.Event) -> int:
+    scans = 0
+    while not stop.is_set():
+        await repo.load_all_responses()
+        scans += 1
+        await asyncio.sleep(0.05)
+    return scans
+
+
+async def run_profile(profile: str, users: int, answers_count: int, admin_scans: bool) -> None:
+    tmp_dir = tempfile.mkdtemp(prefix="bench_db_")
+    path = os.path.join(tmp_dir, "bench.db")
+
+    await repo.open_db(path, readers=2, profile=profile)
+    try:
+        await repo.init_db()
+
+        # немного готовых анкет, чтобы админский скан был не пустым
+        full = {q.key: 0 for q in SURVEY}
+        for uid in range(1_000_000, 1_000_500):
+            await repo.finalize_response(uid, "uz", full)
+
+        stop = asyncio.Event()
+        admin = asyncio.create_task(_admin_scans(stop)) if admin_scans else None
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_respondent(uid, answers_count) for uid in range(users)))
+        elapsed = time.perf_counter() - t0
+
+        stop.set()
+        scans = await admin if admin else 0
+    finally:
+        await repo.close_db()
+
+    writes = users * answers_count
+    print(
+        f"{profile:>7}: {writes} writes in {elapsed:.2f}s -> {writes / elapsed:,.0f} writes/sec "
+        f"({scans} admin scans meanwhile)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--answers", type=int, default=30)
+    parser.add_argument("--profiles", default=",".join(repo.STORAGE_PROFILES))
+    parser.add_argument("--no-admin", action="store_true", help="без параллельных админских сканов")
+    args = parser.parse_args()
+
+    for profile in args.profiles.split(","):
+        asyncio.run(run_profile(profile.strip(), args.users, args.answers, not args.no_admin))
+
+
+if __name__ == "__main__":
+    main()
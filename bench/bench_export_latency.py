@@ -0,0 +1,72 @@
+"""
+Задержка event loop для респондентов, пока админ строит статистику и Excel:
+inline (прямо в хендлере) против пула потоков/процессов из utils.jobs.
+
+    python -m bench.bench_export_latency --respondents 50000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from bench.bench_stats import synthetic_responses
+from handlers.admin import _build_excel_job, _compute_stats_job
+from utils.jobs import JobPool
+
+TICK = 0.005
+
+
+def export_job(responses):
+    totals, stats = _compute_stats_job(responses)
+    path = _build_excel_job(totals, stats, True)
+    os.remove(path)
+
+
+async def _respondent_ticks(stop: asyncio.Event, lags: list):
+    # «респондент» просыпается каждые TICK секунд; опоздание = задержка обработки колбэка
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - t0 - TICK)
+
+
+async def run_mode(mode: str, responses) -> None:
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_respondent_ticks(stop, lags))
+    await asyncio.sleep(0.1)
+
+    t0 = time.perf_counter()
+    if mode == "inline":
+        export_job(responses)
+    else:
+        pool = JobPool(mode, workers=1, max_queue=1)
+        await pool.run(export_job, responses)
+        pool.shutdown()
+    elapsed = time.perf_counter() - t0
+
+    stop.set()
+    await ticker
+
+    lags_ms = sorted(x * 1000 for x in lags)
+    p99 = lags_ms[int(len(lags_ms) * 0.99) - 1] if lags_ms else 0.0
+    print(
+        f"{mode:>7}: export {elapsed:6.2f}s | respondent lag p50 {statistics.median(lags_ms):7.1f} ms, "
+        f"p99 {p99:7.1f} ms, max {lags_ms[-1]:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--respondents", type=int, default=50000)
+    parser.add_argument("--modes", default="inline,thread,process")
+    args = parser.parse_args()
+
+    responses = synthetic_responses(args.respondents)
+    for mode in args.modes.split(","):
+        asyncio.run(run_mode(mode.strip(), responses))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Нагрузочный тест бота без сети: настоящий Dispatcher с handlers, настоящая БД
+(startup() из app.py со всеми буферами), Bot с фейковой сессией.
+N пользователей параллельно проходят всю анкету с «временем на подумать»
+между тапами. Печатает пропускную способность, p50/p95/p99 задержки
+обработки апдейта и число операторов записи в SQLite.
+
+    python -m bench.bench_load --users 1000 --think 0.5 --api-latency 0.05
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import EditMessageText, SendMessage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+_tmp = tempfile.mkdtemp(prefix="bench_load_")
+os.environ.setdefault("DB_PATH", os.path.join(_tmp, "load.db"))
+os.environ.setdefault("JOB_POOL_KIND", "thread")
+
+import app  # noqa: E402  (после DB_PATH)
+from db.repo import get_db, has_submission  # noqa: E402
+from survey.questions import SURVEY  # noqa: E402
+
+_ids = itertools.count(1)
+
+
+class MockSession(BaseSession):
+    """Сессия Bot без сети: отвечает как Telegram, с заданной задержкой."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls = Counter()
+        self.live = {}  # chat_id -> message_id последнего сообщения бота
+        self._message_ids = itertools.count(1_000)
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(method, (SendMessage, EditMessageText)):
+            message_id = method.message_id if isinstance(method, EditMessageText) else next(self._message_ids)
+            self.live[method.chat_id] = message_id
+            return Message(
+                message_id=message_id,
+                date=datetime.datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=method.text,
+            )
+        return True
+
+
+def _user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name="Load")
+
+
+def message_update(user_id: int, text: str) -> Update:
+    return Update(
+        update_id=next(_ids),
+        message=Message(
+            message_id=next(_ids),
+            date=datetime.datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=_user(user_id),
+            text=text,
+        ),
+    )
+
+
+def callback_update(user_id: int, data: str, message_id: int) -> Update:
+    return Update(
+        update_id=next(_ids),
+        callback_query=CallbackQuery(
+            id=str(next(_ids)),
+            chat_instance="load",
+            from_user=_user(user_id),
+            data=data,
+            message=Message(
+                message_id=message_id,
+                date=datetime.datetime.now(),
+                chat=Chat(id=user_id, type="private"),
+                text="q",
+            ),
+        ),
+    )
+
+
+class WriteCounter:
+    """Считает операторы writer-соединения по первому слову (INSERT, UPDATE, COMMIT, ...)."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, sql: str):
+        verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "?"
+        with self._lock:
+            self.counts[verb] += 1
+
+
+def _pct(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def respondent(dp: Dispatcher, bot: Bot, user_id: int, args, rnd: random.Random, latencies: list):
+    async def think():
+        if args.think:
+            await asyncio.sleep(min(rnd.expovariate(1 / args.think), args.think * 5))
+
+    async def feed(update: Update):
+        t0 = time.perf_counter()
+        await dp.feed_update(bot, update)
+        latencies.append(time.perf_counter() - t0)
+
+    await asyncio.sleep(rnd.uniform(0, args.ramp))
+    await feed(message_update(user_id, "/start"))
+    await think()
+    await feed(callback_update(user_id, f"lang:{rnd.choice(['uz', 'ru'])}", 1))
+
+    for q_index, q in enumerate(SURVEY):
+        await think()
+        # тап приходит с живого сообщения с вопросом — последнего, что прислал бот
+        message_id = bot.session.live.get(user_id, 1)
+        await feed(callback_update(user_id, f"ans:{q_index}:{rnd.randrange(len(q.options_uz))}", message_id))
+
+
+async def run(args):
+    writes = WriteCounter()
+    bot = Bot("42:TEST", session=MockSession(args.api_latency))
+    dp = app.build_dispatcher()
+
+    await app.startup()
+    await get_db().trace_writes(writes)
+    latencies: list = []
+    rnd = random.Random(args.seed)
+
+    t0 = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(respondent(dp, bot, 1_000_000 + i, args, random.Random(rnd.random()), latencies) for i in range(args.users))
+        )
+        elapsed = time.perf_counter() - t0
+        done = sum([await has_submission(1_000_000 + i) for i in range(args.users)])
+    finally:
+        await get_db().trace_writes(None)
+        await app.shutdown()
+
+    ms = [x * 1000 for x in latencies]
+    print(f"users={args.users} think={args.think}s api_latency={args.api_latency * 1000:.0f}ms ramp={args.ramp}s")
+    print(f"completed surveys: {done}/{args.users} in {elapsed:.1f}s")
+    print(f"updates: {len(ms)}  throughput: {len(ms) / elapsed:.0f} upd/s")
+    print(
+        f"latency ms: p50={_pct(ms, 0.50):.1f} p95={_pct(ms, 0.95):.1f} "
+        f"p99={_pct(ms, 0.99):.1f} max={max(ms):.1f} mean={statistics.fmean(ms):.1f}"
+    )
+    print(f"slow (> {args.slow_ms:.0f}ms): {sum(1 for x in ms if x > args.slow_ms)}")
+    print("api calls:", dict(bot.session.calls))
+    print("db writes:", dict(writes.counts), f"(per survey: {sum(writes.counts.values()) / max(1, done):.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--think", type=float, default=0.3, help="среднее время между тапами, сек")
+    parser.add_argument("--ramp", type=float, default=5.0, help="за сколько секунд приходят все пользователи")
+    parser.add_argument("--api-latency", type=float, default=0.03, help="задержка ответа Bot API, сек")
+    parser.add_argument("--slow-ms", type=float, default=1000.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
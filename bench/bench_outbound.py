@@ -0,0 +1,102 @@
+"""
+Исходящий планировщик против фейкового Bot API с flood control:
+рассылка на --chats чатов (bulk) и параллельно интерактивные правки респондентов.
+Сравнивает прямые вызовы и OutboundScheduler: 429, потери, задержка правок.
+
+    python -m bench.bench_outbound --chats 150 --edits 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+
+from bench.fake_bot_api import FakeBotAPI
+from utils.outbound import OutboundScheduler, bulk
+
+PORT = 8182
+
+
+async def broadcast(bot: Bot, chats: int) -> int:
+    lost = 0
+
+    async def one(chat_id: int):
+        nonlocal lost
+        try:
+            with bulk():
+                await bot.send_message(chat_id, "news")
+        except TelegramRetryAfter:
+            lost += 1
+
+    await asyncio.gather(*(one(100_000 + i) for i in range(chats)))
+    return lost
+
+
+async def respondents(bot: Bot, edits: int, latencies: list) -> int:
+    lost = 0
+
+    async def one(i: int):
+        nonlocal lost
+        await asyncio.sleep(0.05 * i)
+        t0 = time.perf_counter()
+        try:
+            await bot.edit_message_text("q", chat_id=i + 1, message_id=1)
+            latencies.append(time.perf_counter() - t0)
+        except TelegramRetryAfter:
+            lost += 1
+
+    await asyncio.gather(*(one(i) for i in range(edits)))
+    return lost
+
+
+async def run_case(scheduled: bool, args):
+    api = FakeBotAPI(latency=0.005, global_rate=args.global_rate, chat_rate=1)
+    runner = web.AppRunner(api.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    session = AiohttpSession(api=TelegramAPIServer.from_base(f"http://127.0.0.1:{PORT}"))
+    bot = Bot("42:TEST", session=session)
+    scheduler = None
+    if scheduled:
+        scheduler = OutboundScheduler(global_rate=args.global_rate * 0.9)
+        bot.session.middleware(scheduler)
+
+    latencies: list = []
+    t0 = time.perf_counter()
+    try:
+        lost_bulk, lost_edit = await asyncio.gather(
+            broadcast(bot, args.chats), respondents(bot, args.edits, latencies)
+        )
+    finally:
+        await bot.session.close()
+        await runner.cleanup()
+    elapsed = time.perf_counter() - t0
+
+    p50 = statistics.median(latencies) * 1000 if latencies else 0
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0
+    print(
+        f"{'scheduler' if scheduled else 'direct':<10} {elapsed:6.2f}s  429={api.rejected:<4} "
+        f"lost bulk={lost_bulk:<4} lost edits={lost_edit:<3} edit p50={p50:6.0f}ms p95={p95:6.0f}ms"
+        + (f"  retried={scheduler.retried}" if scheduler else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=150)
+    parser.add_argument("--edits", type=int, default=40)
+    parser.add_argument("--global-rate", type=int, default=30)
+    args = parser.parse_args()
+
+    for scheduled in (False, True):
+        asyncio.run(run_case(scheduled, args))
+
+
+if __name__ == "__main__":
+    main()
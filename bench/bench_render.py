@@ -0,0 +1,54 @@
+"""
+Стоимость одного экрана вопроса: рендер с нуля (текст + kb_single + fingerprint)
+против готового экрана из ui.screens.
+
+    python -m bench.bench_render --n 20000
+"""
+import argparse
+import random
+import time
+
+from survey.questions import SURVEY
+from ui.screens import question_screen, render_question_screen, warm_question_screens
+from utils.render_fingerprint import render_fingerprint
+
+
+def _states(n: int):
+    rnd = random.Random(1)
+    states = []
+    for _ in range(n):
+        q_index = rnd.randrange(len(SURVEY))
+        n_opts = len(SURVEY[q_index].options_uz)
+        selected = rnd.choice([None, rnd.randrange(n_opts)])
+        states.append((q_index, rnd.choice(["uz", "ru"]), selected, rnd.random() < 0.1))
+    return states
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    args = parser.parse_args()
+    states = _states(args.n)
+
+    t0 = time.perf_counter()
+    for state in states:
+        text, markup = render_question_screen(*state)
+        render_fingerprint(text, markup)
+    uncached = (time.perf_counter() - t0) / args.n
+
+    t0 = time.perf_counter()
+    count = warm_question_screens()
+    warm = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for state in states:
+        question_screen(*state)
+    cached = (time.perf_counter() - t0) / args.n
+
+    print(f"screens={count} warm-up={warm * 1000:.0f}ms")
+    print(f"render from scratch: {uncached * 1e6:8.1f} us/screen")
+    print(f"cached lookup:       {cached * 1e6:8.1f} us/screen  (x{uncached / cached:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Сравнение движков статистики на синтетических респондентах:
+handlers.admin.compute_stats (Python) против utils.fast_stats (NumPy).
+
+    python -m bench.bench_stats --sizes 10000,100000,1000000
+"""
+import argparse
+import random
+import time
+
+from db.codec import encode_answers
+from handlers.admin import compute_stats
+from survey.questions import SURVEY
+from utils.fast_stats import HAS_NUMPY, compute_stats_np, compute_stats_rows
+
+
+def synthetic_responses(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        answers = {q.key: rnd.randrange(len(q.options_uz)) for q in SURVEY if rnd.random() < 0.97}
+        out.append((rnd.choice(("uz", "ru")), answers))
+    return out
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - t0
+
+
+def _plain(stats):
+    return {lang: {k: dict(c) for k, c in qs.items() if c} for lang, qs in stats.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        raise SystemExit("numpy is not installed")
+
+    for n in (int(x) for x in args.sizes.split(",")):
+        responses = synthetic_responses(n)
+        rows = [(lang, encode_answers(answers)) for lang, answers in responses]
+
+        (t_py, s_py), dt_py = _timed(compute_stats, responses)
+        (t_np, s_np), dt_np = _timed(compute_stats_np, responses)
+        (t_rows, s_rows), dt_rows = _timed(compute_stats_rows, rows)
+
+        assert t_py == t_np == t_rows
+        assert _plain(s_py) == _plain(s_np) == _plain(s_rows)
+
+        print(
+            f"{n:>9,} respondents: python {dt_py * 1000:8.1f} ms | "
+            f"numpy(dicts) {dt_np * 1000:8.1f} ms | numpy(blobs) {dt_rows * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Фейковый Telegram Bot API для локальных нагрузочных тестов (TELEGRAM_API_URL).
+Отвечает на любые методы: sendMessage/editMessageText возвращают Message,
+остальное — True. Считает вызовы по методам.
+С --global-rate/--chat-rate изображает flood control Telegram: лишние
+send*/edit* за последнюю секунду получают 429 с retry_after.
+
+    python -m bench.fake_bot_api --port 8081 --global-rate 30 --chat-rate 1
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from collections import Counter, defaultdict, deque
+
+from aiohttp import web
+
+
+class FakeBotAPI:
+    def __init__(self, latency: float = 0.0, global_rate: int = 0, chat_rate: int = 0):
+        self.latency = latency
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.calls = Counter()
+        self.rejected = 0
+        self._message_ids = itertools.count(1000)
+        self._global_window: deque = deque()
+        self._chat_windows = defaultdict(deque)
+
+    @staticmethod
+    def _over(window: deque, rate: int, now: float) -> bool:
+        while window and now - window[0] >= 1.0:
+            window.popleft()
+        return len(window) >= rate
+
+    def _flood(self, method: str, chat_id) -> bool:
+        if not method.startswith(("send", "edit")):
+            return False
+        now = time.monotonic()
+        chat_window = self._chat_windows[chat_id]
+        if self.global_rate and self._over(self._global_window, self.global_rate, now):
+            return True
+        if self.chat_rate and self._over(chat_window, self.chat_rate, now):
+            return True
+        self._global_window.append(now)
+        chat_window.append(now)
+        return False
+
+    async def _params(self, request: web.Request) -> dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        return dict(await request.post())
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = await self._params(request)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self._flood(method, params.get("chat_id")):
+            self.rejected += 1
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                },
+                status=429,
+            )
+
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id") or 0)
+            message_id = int(params.get("message_id") or next(self._message_ids))
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+        elif method == "getMe":
+            result = {"id": 42, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+        else:
+            result = True
+
+        return web.json_response({"ok": True, "result": result})
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/stats", lambda _r: web.json_response(dict(self.calls)))
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, сек")
+    parser.add_argument("--global-rate", type=int, default=0, help="лимит send*/edit* в секунду, 0 — без лимита")
+    parser.add_argument("--chat-rate", type=int, default=0, help="то же на один чат")
+    args = parser.parse_args()
+    api = FakeBotAPI(args.latency, args.global_rate, args.chat_rate)
+    web.run_app(api.build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
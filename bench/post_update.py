@@ -0,0 +1,71 @@
+"""
+Отправляет фейковый Update в локальный webhook-сервер (RUN_MODE=webhook),
+чтобы проверить режим без Telegram:
+
+    python -m bench.post_update --user 123 --text /start
+    python -m bench.post_update --user 123 --data lang:uz
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from aiohttp import ClientSession
+
+from config import WEBHOOK_PATH, WEBHOOK_PORT, WEBHOOK_SECRET
+
+_ids = itertools.count(int(time.time()))
+
+
+def fake_message(user_id: int, text: str) -> dict:
+    return {
+        "update_id": next(_ids),
+        "message": {
+            "message_id": next(_ids) % 1_000_000,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+def fake_callback(user_id: int, data: str, message_id: int = 1) -> dict:
+    return {
+        "update_id": next(_ids),
+        "callback_query": {
+            "id": str(next(_ids)),
+            "chat_instance": "local",
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "question",
+            },
+        },
+    }
+
+
+async def post_update(url: str, update: dict, secret: str = WEBHOOK_SECRET) -> int:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    async with ClientSession() as session:
+        async with session.post(url, json=update, headers=headers) as resp:
+            return resp.status
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    parser.add_argument("--user", type=int, default=1)
+    parser.add_argument("--text")
+    parser.add_argument("--data")
+    args = parser.parse_args()
+
+    update = fake_callback(args.user, args.data) if args.data else fake_message(args.user, args.text or "/start")
+    print(asyncio.run(post_update(args.url, update)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Multi-worker режим: фронт принимает webhook от Telegram и раскидывает апдейты
+по воркерам (каждый — обычный app.py в webhook-режиме на своём порту).
+
+- шард = user_id % WORKERS: все апдейты одного пользователя идут в один воркер,
+  поэтому его кэши (progress-буфер, submission-кэш) остаются корректными;
+- общий лимит Bot API (OUTBOUND_GLOBAL_RATE) делится между воркерами поровну;
+- апдейты одного пользователя пересылаются строго по очереди, разных — параллельно;
+- «одна анкета на user_id» держится на PRIMARY KEY submissions + INSERT OR IGNORE,
+  общая БД — SQLite в WAL (DB_PROFILE fast/safe) с busy_timeout.
+
+Запуск: python cluster.py (фронт слушает WEBHOOK_HOST:WEBHOOK_PORT)
+"""
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Dict
+
+from aiohttp import ClientSession, ClientTimeout, web
+
+from config import (
+    METRICS_PORT,
+    OUTBOUND_GLOBAL_RATE,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WORKERS,
+    WORKER_BASE_PORT,
+)
+from utils.signals import cancel_on_sigterm
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def update_user_id(update: Dict[str, Any]) -> int | None:
+    """user_id автора апдейта (message.from, callback_query.from, ...)."""
+    for value in update.values():
+        if isinstance(value, dict):
+            user = value.get("from") or value.get("user")
+            if isinstance(user, dict) and isinstance(user.get("id"), int):
+                return user["id"]
+    return None
+
+
+class Front:
+    def __init__(self, workers: int = WORKERS, base_port: int = WORKER_BASE_PORT, secret: str = WEBHOOK_SECRET):
+        self.workers = max(1, workers)
+        self.urls = [f"http://127.0.0.1:{base_port + i}{WEBHOOK_PATH}" for i in range(self.workers)]
+        self.secret = secret
+        self._session: ClientSession | None = None
+        # user_id -> future последнего апдейта пользователя (очередь на пользователя)
+        self._tails: Dict[int, asyncio.Future] = {}
+
+    async def on_startup(self, _app: web.Application):
+        self._session = ClientSession(timeout=ClientTimeout(total=60))
+
+    async def on_cleanup(self, _app: web.Application):
+        if self._session is not None:
+            await self._session.close()
+
+    async def _forward(self, shard: int, body: bytes) -> int:
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            headers[SECRET_HEADER] = self.secret
+        async with self._session.post(self.urls[shard], data=body, headers=headers) as resp:
+            await resp.read()
+            return resp.status
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret and request.headers.get(SECRET_HEADER) != self.secret:
+            return web.Response(status=401)
+
+        body = await request.read()
+        update = await request.json()
+        user_id = update_user_id(update)
+        shard = user_id % self.workers if user_id is not None else 0
+
+        if user_id is None:
+            return web.Response(status=await self._forward(shard, body))
+
+        prev = self._tails.get(user_id)
+        done = asyncio.get_running_loop().create_future()
+        self._tails[user_id] = done
+        try:
+            if prev is not None:
+                await prev
+            status = await self._forward(shard, body)
+        finally:
+            done.set_result(None)
+            if self._tails.get(user_id) is done:
+                del self._tails[user_id]
+
+        return web.Response(status=status)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, self.handle)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+def _worker_main(port: int, index: int = 0, workers: int = 1):
+    import app as bot_app
+
+    logging.basicConfig(level=logging.INFO)
+    bot_app.migrate_db = False
+    # лимит Telegram общий на бота: каждому воркеру — своя доля
+    bot_app.outbound_global_rate = OUTBOUND_GLOBAL_RATE / max(1, workers)
+    if METRICS_PORT:
+        bot_app.metrics_port = METRICS_PORT + index
+
+    async def run():
+        cancel_on_sigterm()
+        await bot_app.run_webhook(
+            bot_app.create_bot(),
+            bot_app.build_dispatcher(),
+            host="127.0.0.1",
+            port=port,
+            set_webhook=False,
+        )
+
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+async def init_db_once():
+    """
+    Схема и миграции — один раз, до старта воркеров: параллельные _migrate
+    в нескольких процессах гоняются за ALTER TABLE и упираются в busy_timeout.
+    """
+    from config import DB_PATH, DB_PROFILE
+    from db.repo import close_db, init_db, open_db
+
+    await open_db(DB_PATH, readers=1, profile=DB_PROFILE)
+    try:
+        await init_db()
+    finally:
+        await close_db()
+
+
+def start_workers(workers: int = WORKERS, base_port: int = WORKER_BASE_PORT):
+    procs = []
+    for i in range(workers):
+        p = multiprocessing.Process(target=_worker_main, args=(base_port + i, i, workers), name=f"worker-{i}")
+        p.start()
+        procs.append(p)
+    return procs
+
+
+def stop_workers(procs):
+    # SIGTERM -> воркер корректно останавливается и сбрасывает буферы в БД
+    for p in procs:
+        if p.is_alive():
+            p.terminate()
+    for p in procs:
+        p.join(timeout=30)
+
+
+async def run_front(front: Front, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT):
+    cancel_on_sigterm()
+    runner = web.AppRunner(front.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("front on %s:%s%s -> %s workers", host, port, WEBHOOK_PATH, front.workers)
+
+    if WEBHOOK_BASE_URL:
+        import app as bot_app
+
+        bot = bot_app.create_bot()
+        async with bot.session:
+            await bot.set_webhook(WEBHOOK_BASE_URL.rstrip("/") + WEBHOOK_PATH, secret_token=WEBHOOK_SECRET or None)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(init_db_once())
+    procs = start_workers()
+    try:
+        asyncio.run(run_front(Front()))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        stop_workers(procs)
+
+
+if __name__ == "__main__":
+    main()
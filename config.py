@@ -13,3 +13,83 @@ if _raw:
         x = x.strip()
         if x.isdigit():
             ADMIN_IDS.add(int(x))
+
+# сколько reader-соединений держать открытыми (плюс один writer)
+DB_READERS = int(os.getenv("DB_READERS", "2"))
+
+# профиль хранения SQLite: fast (WAL + synchronous=NORMAL), safe (WAL + FULL), legacy
+DB_PROFILE = os.getenv("DB_PROFILE", "fast").strip().lower()
+
+# group commit для финализации анкет (пачка по размеру или по таймауту)
+FINALIZE_GROUP_COMMIT = os.getenv("FINALIZE_GROUP_COMMIT", "0").strip() in ("1", "true", "yes")
+FINALIZE_BATCH_SIZE = int(os.getenv("FINALIZE_BATCH_SIZE", "100"))
+FINALIZE_BATCH_MS = int(os.getenv("FINALIZE_BATCH_MS", "20"))
+
+# write-behind буфер для progress: сброс раз в PROGRESS_FLUSH_MS или по PROGRESS_FLUSH_ROWS
+PROGRESS_WRITE_BEHIND = os.getenv("PROGRESS_WRITE_BEHIND", "1").strip() in ("1", "true", "yes")
+PROGRESS_FLUSH_MS = int(os.getenv("PROGRESS_FLUSH_MS", "250"))
+PROGRESS_FLUSH_ROWS = int(os.getenv("PROGRESS_FLUSH_ROWS", "500"))
+
+# кэш has_submission в памяти (прогревается из submissions на старте)
+SUBMISSION_CACHE = os.getenv("SUBMISSION_CACHE", "1").strip() in ("1", "true", "yes")
+SUBMISSION_CACHE_NEGATIVE = int(os.getenv("SUBMISSION_CACHE_NEGATIVE", "10000"))
+
+# откуда брать статистику для админа:
+# counts (материализованные счётчики), sql (GROUP BY по answer_items),
+# numpy (векторный подсчёт по всем анкетам), scan (разбор всех анкет в Python)
+STATS_BACKEND = os.getenv("STATS_BACKEND", "counts").strip().lower()
+
+# Excel-выгрузка через write-only листы (потоково, без книги целиком в памяти)
+EXCEL_STREAMING = os.getenv("EXCEL_STREAMING", "1").strip() in ("1", "true", "yes")
+
+# кэш готовых выгрузок (сколько файлов хранить и сколько секунд)
+EXPORT_CACHE_ITEMS = int(os.getenv("EXPORT_CACHE_ITEMS", "16"))
+EXPORT_CACHE_TTL = int(os.getenv("EXPORT_CACHE_TTL", str(24 * 3600)))
+# сколько секунд не удалять только что отданный файл (пока он отправляется)
+EXPORT_CACHE_GRACE = int(os.getenv("EXPORT_CACHE_GRACE", "600"))
+
+# пул для тяжёлых задач админа (статистика, Excel): process или thread
+JOB_POOL_KIND = os.getenv("JOB_POOL_KIND", "process").strip().lower()
+JOB_POOL_WORKERS = int(os.getenv("JOB_POOL_WORKERS", "1"))
+JOB_POOL_QUEUE = int(os.getenv("JOB_POOL_QUEUE", "4"))
+
+# режим запуска: polling или webhook (aiohttp-сервер)
+RUN_MODE = os.getenv("RUN_MODE", "polling").strip().lower()
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "").strip()  # публичный https-адрес; пусто — setWebhook не вызываем
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook").strip()
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "").strip()
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0").strip()
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+
+# адрес Bot API (пусто — api.telegram.org); формат: http://127.0.0.1:8081
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "").strip()
+
+# multi-worker режим (cluster.py): число воркеров и порт первого из них
+WORKERS = int(os.getenv("WORKERS", "2"))
+WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", "8090"))
+
+# сколько апдейтов одного пользователя может ждать в очереди (лишние тапы отбрасываются)
+USER_QUEUE_MAX = int(os.getenv("USER_QUEUE_MAX", "8"))
+
+# исходящие запросы к Bot API: лимиты Telegram (общий и на чат), повтор на 429, приоритет правок
+OUTBOUND_SCHEDULER = os.getenv("OUTBOUND_SCHEDULER", "1").strip() in ("1", "true", "yes")
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "5"))
+# 1 — правки экрана респондента тоже ждут лимит чата (медленнее отклик на тап)
+OUTBOUND_CHAT_LIMIT_EDITS = os.getenv("OUTBOUND_CHAT_LIMIT_EDITS", "0").strip() in ("1", "true", "yes")
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+
+# сколько пользователей помнить «что показано в сообщении» (пропуск одинаковых edit)
+RENDER_FINGERPRINTS = int(os.getenv("RENDER_FINGERPRINTS", "100000"))
+
+# HTTP /metrics в формате Prometheus (0 — не поднимать); в cluster.py воркер i слушает METRICS_PORT + i
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1").strip()
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# выборочный cProfile апдейтов: каждый PROFILE_EVERY-й (0 — нет) и/или все апдейты PROFILE_USER_ID;
+# отчёт — админ-команда /profile и файл PROFILE_DUMP (пусто — не писать)
+PROFILE_EVERY = int(os.getenv("PROFILE_EVERY", "0"))
+PROFILE_USER_ID = int(os.getenv("PROFILE_USER_ID", "0"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "25"))
+PROFILE_DUMP = os.getenv("PROFILE_DUMP", "").strip()
@@ -0,0 +1,142 @@
+import json
+from typing import Any, Dict, List
+
+from survey.questions import SURVEY
+
+# Компактное бинарное представление ответов (вместо answers_json).
+# Первый байт — версия формата, дальше вопросы строго в порядке SURVEY:
+#
+#   v1: single -> 1 байт (индекс варианта, 0xFF = нет ответа)
+#       multi  -> 2 байта little-endian битовая маска (0xFFFF = нет ответа)
+#   v2: только single-вопросы с <= 15 вариантами: по 4 бита на вопрос
+#       (0xF = нет ответа), два вопроса в байте
+#
+# Старые строки с JSON-текстом читаются как раньше. Если ответы не влезают
+# в бинарный формат (чужие ключи, list у single-вопроса и т.п.) — пишем JSON.
+
+V1 = 1
+V2 = 2
+
+_MISSING_BYTE = 0xFF
+_MISSING_MASK = 0xFFFF
+_MISSING_NIBBLE = 0xF
+
+_KEYS: List[str] = [q.key for q in SURVEY]
+_KEY_SET = set(_KEYS)
+_MULTI: List[bool] = [q.multi for q in SURVEY]
+_N_OPTS: List[int] = [max(len(q.options_uz), len(q.options_ru)) for q in SURVEY]
+
+_NIBBLE_OK = not any(_MULTI) and all(n <= 15 for n in _N_OPTS)
+
+
+def _to_json(answers: Dict[str, Any]) -> str:
+    return json.dumps(answers, ensure_ascii=False)
+
+
+def _encode_v1(answers: Dict[str, Any]) -> bytes | None:
+    out = bytearray([V1])
+    for key, multi, n_opts in zip(_KEYS, _MULTI, _N_OPTS):
+        val = answers.get(key)
+        if multi:
+            if val is None:
+                mask = _MISSING_MASK
+            else:
+                if not isinstance(val, list):
+                    return None
+                mask = 0
+                for opt in val:
+                    if type(opt) is not int or not 0 <= opt < min(n_opts, 15):
+                        return None
+                    mask |= 1 << opt
+            out += mask.to_bytes(2, "little")
+        else:
+            if val is None:
+                out.append(_MISSING_BYTE)
+            elif type(val) is int and 0 <= val < min(n_opts, _MISSING_BYTE):
+                out.append(val)
+            else:
+                return None
+    return bytes(out)
+
+
+def _encode_v2(answers: Dict[str, Any]) -> bytes | None:
+    nibbles = []
+    for key, n_opts in zip(_KEYS, _N_OPTS):
+        val = answers.get(key)
+        if val is None:
+            nibbles.append(_MISSING_NIBBLE)
+        elif type(val) is int and 0 <= val < n_opts:
+            nibbles.append(val)
+        else:
+            return None
+
+    if len(nibbles) % 2:
+        nibbles.append(_MISSING_NIBBLE)
+
+    out = bytearray([V2])
+    for i in range(0, len(nibbles), 2):
+        out.append((nibbles[i] << 4) | nibbles[i + 1])
+    return bytes(out)
+
+
+def encode_answers(answers: Dict[str, Any]) -> bytes | str:
+    """Ответы -> bytes (v2/v1) или JSON-текст, если бинарный формат не подходит."""
+    if any(key not in _KEY_SET for key in answers):
+        return _to_json(answers)
+
+    blob = _encode_v2(answers) if _NIBBLE_OK else None
+    if blob is None:
+        blob = _encode_v1(answers)
+    return blob if blob is not None else _to_json(answers)
+
+
+def _decode_v1(data: bytes) -> Dict[str, Any]:
+    answers: Dict[str, Any] = {}
+    pos = 1
+    for key, multi in zip(_KEYS, _MULTI):
+        if multi:
+            if pos + 2 > len(data):
+                break
+            mask = int.from_bytes(data[pos:pos + 2], "little")
+            pos += 2
+            if mask != _MISSING_MASK:
+                answers[key] = [i for i in range(15) if mask & (1 << i)]
+        else:
+            if pos >= len(data):
+                break
+            val = data[pos]
+            pos += 1
+            if val != _MISSING_BYTE:
+                answers[key] = val
+    return answers
+
+
+def _decode_v2(data: bytes) -> Dict[str, Any]:
+    answers: Dict[str, Any] = {}
+    for i, key in enumerate(_KEYS):
+        pos = 1 + i // 2
+        if pos >= len(data):
+            break
+        val = (data[pos] >> 4) if i % 2 == 0 else (data[pos] & 0x0F)
+        if val != _MISSING_NIBBLE:
+            answers[key] = val
+    return answers
+
+
+def decode_answers(value: bytes | str | None) -> Dict[str, Any]:
+    """Читает и бинарные строки, и старые JSON-строки. Битые данные -> ValueError."""
+    if value is None:
+        return {}
+
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        if data[:1] == bytes([V2]):
+            return _decode_v2(data)
+        if data[:1] == bytes([V1]):
+            return _decode_v1(data)
+        raise ValueError(f"unknown answers format: {data[:1]!r}")
+
+    answers = json.loads(value)
+    if not isinstance(answers, dict):
+        raise ValueError("answers_json is not an object")
+    return answers
@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Tuple
+
+
+class GroupCommitQueue:
+    """
+    Копит элементы и отдаёт их пачкой в flush_fn (одна транзакция на пачку).
+    Пачка уходит, когда набралось max_batch элементов или прошло max_delay_ms
+    с момента появления первого элемента.
+
+    flush_fn(items) -> список результатов той же длины, что и items.
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 100,
+        max_delay_ms: int = 20,
+    ):
+        self.flush_fn = flush_fn
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0, max_delay_ms) / 1000
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        if self._closed:
+            raise RuntimeError("GroupCommitQueue is closed")
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((item, fut))
+        self._wakeup.set()
+        return await fut
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+
+            if len(self._pending) < self.max_batch and not self._closed:
+                try:
+                    await asyncio.wait_for(self._full_or_closed(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            await self._flush_pending()
+
+            if self._closed and not self._pending:
+                return
+
+    async def _full_or_closed(self):
+        while len(self._pending) < self.max_batch and not self._closed:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _flush_pending(self):
+        while self._pending:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+
+            try:
+                results = await self.flush_fn([item for item, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+        self._wakeup.clear()
+
+    async def close(self):
+        """Дописывает всё, что накопилось, и останавливает фоновую задачу."""
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
@@ -1 +1,25 @@
-from .repo import init_db, set_lang_and_reset, get_progress, save_progress, finalize_response, load_all_responses
+from .repo import (
+    Database,
+    open_db,
+    close_db,
+    get_db,
+    init_db,
+    set_lang_and_reset,
+    get_progress,
+    load_progress,
+    save_progress,
+    has_submission,
+    finalize_response,
+    finalize_many,
+    enable_group_commit,
+    enable_progress_buffer,
+    flush_progress,
+    enable_submission_cache,
+    load_all_responses,
+    load_submission_rows,
+    iter_submissions,
+    submission_watermark,
+    load_stats,
+    rebuild_stats_counts,
+    check_stats_counts,
+)
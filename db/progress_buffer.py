@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from .codec import encode_answers
+from utils.metrics import DB_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# lang, q_index, answers, last_msg_id, answered_mask
+ProgressRow = Tuple[str, int, Dict[str, Any], Optional[int], int]
+
+
+class ProgressBuffer:
+    """
+    Write-behind для таблицы progress.
+    save_progress только кладёт строку в память (последняя запись на user_id побеждает),
+    а фоновая задача сбрасывает накопленное одной транзакцией раз в flush_ms
+    или когда набралось max_rows пользователей.
+
+    Все операции с содержимым буфера, влияющие на БД, выполняются под
+    write-локом Database, поэтому flush не может «воскресить» прогресс,
+    который finalize уже удалил.
+    """
+
+    def __init__(self, db, flush_ms: int = 250, max_rows: int = 500):
+        self.db = db
+        self.flush_interval = max(1, flush_ms) / 1000
+        self.max_rows = max(1, max_rows)
+        self._dirty: Dict[int, ProgressRow] = {}
+        # пачка, которая сейчас пишется: видна читателям до commit
+        self._inflight: Dict[int, ProgressRow] = {}
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def get(self, user_id: int) -> ProgressRow | None:
+        row = self._dirty.get(user_id)
+        if row is None:
+            row = self._inflight.get(user_id)
+        if row is None:
+            return None
+        lang, q_index, answers, last_msg_id, answered_mask = row
+        return lang, q_index, dict(answers), last_msg_id, answered_mask
+
+    def put(
+        self,
+        user_id: int,
+        lang: str,
+        q_index: int,
+        answers: Dict[str, Any],
+        last_msg_id: Optional[int],
+        answered_mask: int = 0,
+    ):
+        self._dirty[user_id] = (lang, q_index, dict(answers), last_msg_id, answered_mask)
+        if len(self._dirty) >= self.max_rows:
+            self._full.set()
+
+    def discard(self, user_id: int):
+        self._dirty.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._dirty)
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("progress flush failed")
+
+    async def flush(self):
+        if not self._dirty:
+            return
+
+        with DB_SECONDS.time(op="progress_flush"):
+            await self._flush()
+
+    async def _flush(self):
+        async with self.db.write() as conn:
+            batch, self._dirty = self._dirty, {}
+            self._inflight = batch
+            try:
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id, answered_mask) "
+                    "VALUES(?, ?, ?, ?, ?, ?)",
+                    [
+                        (user_id, lang, q_index, encode_answers(answers), last_msg_id, answered_mask)
+                        for user_id, (lang, q_index, answers, last_msg_id, answered_mask) in batch.items()
+                    ],
+                )
+                await conn.commit()
+            except BaseException:
+                # возвращаем строки в буфер, не затирая более свежие
+                for user_id, row in batch.items():
+                    self._dirty.setdefault(user_id, row)
+                raise
+            finally:
+                self._inflight = {}
+
+    async def close(self):
+        """Останавливает фоновую задачу и сбрасывает остаток в БД."""
+        self._closed = True
+        self._full.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
@@ -1,13 +1,190 @@
-import json
-from typing import Dict, Any, Optional, Tuple, List
+import asyncio
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple, List
 
 import aiosqlite
 
+from .codec import encode_answers, decode_answers
+from .group_commit import GroupCommitQueue
+from .progress_buffer import ProgressBuffer
+from .submission_cache import SubmissionCache
+from survey.questions import SURVEY
+from survey.schema import SCHEMA
+from utils.metrics import DB_LOCK_WAIT, DB_SECONDS, db_timed, gauge
+
 DB_PATH = "survey.db"
 
+# Наборы PRAGMA, применяемые к каждому соединению (выбираются через config.DB_PROFILE).
+# legacy — настройки SQLite по умолчанию (rollback journal, synchronous=FULL).
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "legacy": {},
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -16000,  # ~16 MB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+class Database:
+    """
+    Долгоживущие соединения с SQLite на весь процесс:
+    один writer (под asyncio.Lock) + пул reader-соединений.
+    Создаётся в app.main() через open_db() и закрывается через close_db().
+    """
+
+    def __init__(self, path: str = DB_PATH, readers: int = 2, profile: str = "fast"):
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown DB profile: {profile!r}")
+        self.path = path
+        self.readers_count = max(1, readers)
+        self.pragmas = STORAGE_PROFILES[profile]
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue[aiosqlite.Connection | None] = asyncio.Queue()
+        self._all_readers: List[aiosqlite.Connection] = []
+        # сколько read() сейчас ждут свободного reader (их будит close)
+        self._read_waiters = 0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.path)
+        for name, value in self.pragmas.items():
+            await conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    async def open(self):
+        self._writer = await self._connect()
+        for _ in range(self.readers_count):
+            conn = await self._connect()
+            self._all_readers.append(conn)
+            self._readers.put_nowait(conn)
+
+    async def close(self):
+        # ждущие reader получают None и падают с RuntimeError, а не висят вечно
+        readers, self._readers = self._readers, asyncio.Queue()
+        for _ in range(self._read_waiters):
+            readers.put_nowait(None)
+
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers.clear()
+
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    async def trace_writes(self, callback: Callable[[str], None] | None):
+        """
+        callback(sql) на каждый оператор writer-соединения (None — выключить).
+        Вызывается в потоке aiosqlite, так что должен быть быстрым и потокобезопасным.
+        """
+        if self._writer is None:
+            raise RuntimeError("Database is not opened")
+        await self._writer.set_trace_callback(callback)
+
+    @asynccontextmanager
+    async def read(self):
+        if not self._all_readers:
+            raise RuntimeError("Database is not opened")
+        readers = self._readers
+        self._read_waiters += 1
+        try:
+            conn = await readers.get()
+        finally:
+            self._read_waiters -= 1
+        if conn is None:
+            raise RuntimeError("Database is closed")
+        try:
+            yield conn
+        finally:
+            # после close() соединение уже закрыто — в новую очередь не возвращаем
+            if readers is self._readers:
+                readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self):
+        if self._writer is None:
+            raise RuntimeError("Database is not opened")
+        t0 = time.perf_counter()
+        async with self._write_lock:
+            DB_LOCK_WAIT.observe(time.perf_counter() - t0)
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+
+_db: Database | None = None
+
+
+async def open_db(path: str = DB_PATH, readers: int = 2, profile: str = "fast") -> Database:
+    global _db
+    if _db is None:
+        _db = Database(path, readers, profile)
+        await _db.open()
+    return _db
+
+
+async def close_db():
+    global _db, _finalize_queue, _progress_buffer, _submission_cache
+    if _finalize_queue is not None:
+        await _finalize_queue.close()
+        _finalize_queue = None
+
+    if _progress_buffer is not None:
+        await _progress_buffer.close()
+        _progress_buffer = None
+
+    if _db is not None:
+        await _db.close()
+        _db = None
+
+    _submission_cache = None
+
+
+def get_db() -> Database:
+    if _db is None:
+        raise RuntimeError("Database is not opened. Call open_db() first")
+    return _db
+
+
+_progress_buffer: ProgressBuffer | None = None
+
+gauge(
+    "bot_progress_buffer_rows",
+    "Progress rows waiting for write-behind flush",
+    lambda: len(_progress_buffer) if _progress_buffer is not None else None,
+)
+
+
+def enable_progress_buffer(flush_ms: int = 250, max_rows: int = 500):
+    """Включает write-behind для progress (сбрасывается в close_db)."""
+    global _progress_buffer
+    if _progress_buffer is None:
+        _progress_buffer = ProgressBuffer(get_db(), flush_ms, max_rows)
+        _progress_buffer.start()
+
+
+async def flush_progress():
+    if _progress_buffer is not None:
+        await _progress_buffer.flush()
+
 
 async def init_db():
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with get_db().write() as db:
         # текущий прогресс (можно проходить, пока не завершил)
         await db.execute("""
         CREATE TABLE IF NOT EXISTS progress (
@@ -15,7 +192,8 @@ async def init_db():
             lang TEXT NOT NULL DEFAULT 'uz',
             q_index INTEGER NOT NULL DEFAULT 0,
             answers_json TEXT NOT NULL DEFAULT '{}',
-            last_msg_id INTEGER
+            last_msg_id INTEGER,
+            answered_mask INTEGER NOT NULL DEFAULT 0
         );
         """)
 
@@ -39,43 +217,200 @@ async def init_db():
         );
         """)
 
-        await db.commit()
-
-
-async def set_lang_and_reset(user_id: int, lang: str):
-    async with aiosqlite.connect(DB_PATH) as db:
+        # нормализованные ответы для статистики через GROUP BY:
+        # одна строка на (респондент, вопрос, вариант); multi -> несколько строк
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS answer_items (
+            user_id INTEGER NOT NULL,
+            lang TEXT NOT NULL,
+            q_idx INTEGER NOT NULL,
+            opt_idx INTEGER NOT NULL
+        );
+        """)
         await db.execute(
-            "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id) "
-            "VALUES(?, ?, 0, '{}', NULL)",
-            (user_id, lang),
+            "CREATE INDEX IF NOT EXISTS idx_answer_items_q ON answer_items(q_idx, opt_idx, lang)"
         )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answer_items_user ON answer_items(user_id)"
+        )
+
+        # материализованная статистика: счётчики lang × вопрос × вариант,
+        # обновляются в той же транзакции, что и финализация анкеты
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS stats_counts (
+            lang TEXT NOT NULL,
+            q_idx INTEGER NOT NULL,
+            opt_idx INTEGER NOT NULL,
+            cnt INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (lang, q_idx, opt_idx)
+        ) WITHOUT ROWID;
+        """)
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            lang TEXT PRIMARY KEY,
+            cnt INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        """)
+
+        await _migrate(db)
         await db.commit()
 
 
-async def get_progress(user_id: int) -> Tuple[str, int, Dict[str, Any], Optional[int]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            "SELECT lang, q_index, answers_json, last_msg_id FROM progress WHERE user_id=?",
-            (user_id,),
+# версия схемы хранится в PRAGMA user_version
+SCHEMA_VERSION = 3
+
+
+async def _migrate(db: aiosqlite.Connection):
+    cur = await db.execute("PRAGMA user_version")
+    version = (await cur.fetchone())[0]
+
+    if version < 1:
+        await _backfill_answer_items(db)
+
+    if version < 2:
+        await _rebuild_stats_counts(db)
+
+    if version < 3:
+        await _add_answered_mask(db)
+
+    if version < SCHEMA_VERSION:
+        await db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+_Q_INDEX: Dict[str, int] = SCHEMA.index
+
+
+def _answer_items(user_id: int, lang: str, answers: Dict[str, Any]) -> List[Tuple[int, str, int, int]]:
+    # те же правила, что и в compute_stats: int или list[int] (старые ответы)
+    items = []
+    for key, val in answers.items():
+        q_idx = _Q_INDEX.get(key)
+        if q_idx is None:
+            continue
+        if isinstance(val, list):
+            items.extend((user_id, lang, q_idx, opt) for opt in val if isinstance(opt, int))
+        elif isinstance(val, int):
+            items.append((user_id, lang, q_idx, val))
+    return items
+
+
+async def _backfill_answer_items(db: aiosqlite.Connection, chunk_size: int = 1000):
+    await db.execute("DELETE FROM answer_items")
+    cur = await db.execute("SELECT user_id, lang, answers_json FROM submissions")
+    while True:
+        rows = await cur.fetchmany(chunk_size)
+        if not rows:
+            break
+
+        items = []
+        for user_id, lang, answers_json in rows:
+            try:
+                items.extend(_answer_items(user_id, lang, decode_answers(answers_json)))
+            except Exception:
+                pass
+        await db.executemany(
+            "INSERT INTO answer_items(user_id, lang, q_idx, opt_idx) VALUES(?, ?, ?, ?)",
+            items,
         )
-        row = await cur.fetchone()
 
-        if not row:
+
+async def _rebuild_stats_counts(db: aiosqlite.Connection):
+    await db.execute("DELETE FROM stats_counts")
+    await db.execute("DELETE FROM stats_totals")
+    await db.execute(
+        "INSERT INTO stats_counts(lang, q_idx, opt_idx, cnt) "
+        "SELECT lang, q_idx, opt_idx, COUNT(*) FROM answer_items GROUP BY lang, q_idx, opt_idx"
+    )
+    await db.execute(
+        "INSERT INTO stats_totals(lang, cnt) SELECT lang, COUNT(*) FROM submissions GROUP BY lang"
+    )
+
+
+async def _add_answered_mask(db: aiosqlite.Connection):
+    # v3: маска отвеченных вопросов в progress (бит i = ответ на SURVEY[i])
+    cur = await db.execute("PRAGMA table_info(progress)")
+    columns = {row[1] for row in await cur.fetchall()}
+    if "answered_mask" not in columns:
+        await db.execute("ALTER TABLE progress ADD COLUMN answered_mask INTEGER NOT NULL DEFAULT 0")
+
+    cur = await db.execute("SELECT user_id, answers_json FROM progress")
+    updates = []
+    for user_id, answers_json in await cur.fetchall():
+        try:
+            answers = decode_answers(answers_json)
+        except Exception:
+            continue
+        updates.append((SCHEMA.mask_of(answers), user_id))
+    await db.executemany("UPDATE progress SET answered_mask=? WHERE user_id=?", updates)
+
+
+ProgressTuple = Tuple[str, int, Dict[str, Any], Optional[int], int]
+
+
+async def set_lang_and_reset(user_id: int, lang: str):
+    if _progress_buffer is not None:
+        _progress_buffer.put(user_id, lang, 0, {}, None, 0)
+        return
+
+    with DB_SECONDS.time(op="set_lang_and_reset"):
+        async with get_db().write() as db:
             await db.execute(
-                "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id) "
-                "VALUES(?, 'uz', 0, '{}', NULL)",
-                (user_id,),
+                "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id, answered_mask) "
+                "VALUES(?, ?, 0, '{}', NULL, 0)",
+                (user_id, lang),
             )
             await db.commit()
-            return "uz", 0, {}, None
 
-        lang, q_index, answers_json, last_msg_id = row
-        try:
-            answers = json.loads(answers_json)
-        except Exception:
-            answers = {}
 
-        return lang, int(q_index), answers, last_msg_id
+async def load_progress(user_id: int) -> ProgressTuple | None:
+    """
+    Как get_progress, но без создания строки: None, если прогресса нет.
+    -> (lang, q_index, answers, last_msg_id, answered_mask)
+    """
+    if _progress_buffer is not None:
+        pending = _progress_buffer.get(user_id)
+        if pending is not None:
+            return pending
+
+    # в bot_db_seconds — только поход в SQLite, попадания в буфер/кэш не считаем
+    with DB_SECONDS.time(op="load_progress"):
+        async with get_db().read() as db:
+            cur = await db.execute(
+                "SELECT lang, q_index, answers_json, last_msg_id, answered_mask FROM progress WHERE user_id=?",
+                (user_id,),
+            )
+            row = await cur.fetchone()
+
+    if not row:
+        return None
+
+    lang, q_index, answers_json, last_msg_id, answered_mask = row
+    try:
+        answers = decode_answers(answers_json)
+    except Exception:
+        answers, answered_mask = {}, 0
+
+    return lang, int(q_index), answers, last_msg_id, int(answered_mask)
+
+
+async def get_progress(user_id: int) -> ProgressTuple:
+    progress = await load_progress(user_id)
+    if progress is not None:
+        return progress
+
+    if _progress_buffer is not None:
+        _progress_buffer.put(user_id, "uz", 0, {}, None, 0)
+        return "uz", 0, {}, None, 0
+
+    with DB_SECONDS.time(op="get_progress"):
+        async with get_db().write() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id, answered_mask) "
+                "VALUES(?, 'uz', 0, '{}', NULL, 0)",
+                (user_id,),
+            )
+            await db.commit()
+    return "uz", 0, {}, None, 0
 
 
 async def save_progress(
@@ -84,25 +419,142 @@ async def save_progress(
     q_index: int,
     answers: Dict[str, Any],
     last_msg_id: Optional[int],
+    answered_mask: Optional[int] = None,
 ):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id) "
-            "VALUES(?, ?, ?, ?, ?)",
-            (user_id, lang, q_index, json.dumps(answers, ensure_ascii=False), last_msg_id),
-        )
-        await db.commit()
+    """answered_mask=None — посчитать по answers."""
+    if answered_mask is None:
+        answered_mask = SCHEMA.mask_of(answers)
+
+    if _progress_buffer is not None:
+        _progress_buffer.put(user_id, lang, q_index, answers, last_msg_id, answered_mask)
+        return
+
+    with DB_SECONDS.time(op="save_progress"):
+        async with get_db().write() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO progress(user_id, lang, q_index, answers_json, last_msg_id, answered_mask) "
+                "VALUES(?, ?, ?, ?, ?, ?)",
+                (user_id, lang, q_index, encode_answers(answers), last_msg_id, answered_mask),
+            )
+            await db.commit()
 
 
 # ✅ Проверка: уже сдавал или нет
+_submission_cache: SubmissionCache | None = None
+
+
+async def enable_submission_cache(negative_size: int = 10000, authoritative: bool = True):
+    """Включает кэш has_submission и прогревает его всеми user_id из submissions."""
+    global _submission_cache
+    cache = SubmissionCache(negative_size, authoritative)
+    async with get_db().read() as db:
+        cur = await db.execute("SELECT user_id FROM submissions ORDER BY user_id")
+        cache.load(row[0] for row in await cur.fetchall())
+    _submission_cache = cache
+
+
 async def has_submission(user_id: int) -> bool:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            "SELECT 1 FROM submissions WHERE user_id=? LIMIT 1",
-            (user_id,),
+    if _submission_cache is not None:
+        known = _submission_cache.lookup(user_id)
+        if known is not None:
+            return known
+
+    with DB_SECONDS.time(op="has_submission"):
+        async with get_db().read() as db:
+            cur = await db.execute(
+                "SELECT 1 FROM submissions WHERE user_id=? LIMIT 1",
+                (user_id,),
+            )
+            row = await cur.fetchone()
+
+    if _submission_cache is not None:
+        if row is not None:
+            _submission_cache.add(user_id)
+        else:
+            _submission_cache.remember_missing(user_id)
+    return row is not None
+
+
+def _remember_submitted(user_ids):
+    # и saved=True, и saved=False означают, что запись в submissions есть
+    if _submission_cache is not None:
+        for user_id in user_ids:
+            _submission_cache.add(user_id)
+
+
+async def _finalize_in_tx(db: aiosqlite.Connection, user_id: int, lang: str, answers: Dict[str, Any]) -> bool:
+    payload = encode_answers(answers)
+
+    # если уже есть submissions.user_id -> повторно не вставится
+    cur = await db.execute(
+        "INSERT OR IGNORE INTO submissions(user_id, lang, answers_json) VALUES(?, ?, ?)",
+        (user_id, lang, payload),
+    )
+    saved = cur.rowcount == 1
+
+    # старую таблицу responses и answer_items пишем только для первой сдачи
+    if saved:
+        await db.execute(
+            "INSERT INTO responses(lang, answers_json) VALUES(?, ?)",
+            (lang, payload),
+        )
+        items = _answer_items(user_id, lang, answers)
+        await db.executemany(
+            "INSERT INTO answer_items(user_id, lang, q_idx, opt_idx) VALUES(?, ?, ?, ?)",
+            items,
+        )
+        await db.executemany(
+            "INSERT INTO stats_counts(lang, q_idx, opt_idx, cnt) VALUES(?, ?, ?, 1) "
+            "ON CONFLICT(lang, q_idx, opt_idx) DO UPDATE SET cnt = cnt + 1",
+            [(item_lang, q_idx, opt_idx) for _, item_lang, q_idx, opt_idx in items],
         )
-        row = await cur.fetchone()
-        return row is not None
+        await db.execute(
+            "INSERT INTO stats_totals(lang, cnt) VALUES(?, 1) "
+            "ON CONFLICT(lang) DO UPDATE SET cnt = cnt + 1",
+            (lang,),
+        )
+
+    # прогресс удаляем в любом случае (чтобы не зависало);
+    # запись из write-behind буфера — только после commit (_discard_progress)
+    await db.execute("DELETE FROM progress WHERE user_id=?", (user_id,))
+    return saved
+
+
+def _discard_progress(user_ids):
+    """
+    Несброшенный прогресс после успешного commit финализации больше не нужен.
+    Вызывается под write-локом, чтобы flush буфера не вернул удалённую строку;
+    если commit упал, прогресс в буфере остаётся.
+    """
+    if _progress_buffer is not None:
+        for user_id in user_ids:
+            _progress_buffer.discard(user_id)
+
+
+@db_timed
+async def finalize_many(items: List[Tuple[int, str, Dict[str, Any]]]) -> List[bool]:
+    """
+    Финализирует сразу несколько пользователей одной транзакцией (один commit).
+    items: [(user_id, lang, answers), ...]; результат — saved для каждого элемента.
+    """
+    async with get_db().write() as db:
+        results = [await _finalize_in_tx(db, user_id, lang, answers) for user_id, lang, answers in items]
+        await db.commit()
+        _discard_progress(user_id for user_id, _, _ in items)
+
+    _remember_submitted(user_id for user_id, _, _ in items)
+    return results
+
+
+_finalize_queue: GroupCommitQueue | None = None
+
+
+def enable_group_commit(max_batch: int = 100, max_delay_ms: int = 20):
+    """Включает очередь group commit для finalize_response (закрывается в close_db)."""
+    global _finalize_queue
+    if _finalize_queue is None:
+        _finalize_queue = GroupCommitQueue(finalize_many, max_batch, max_delay_ms)
+        _finalize_queue.start()
 
 
 # ✅ Финализация: сохраняем строго 1 раз
@@ -112,44 +564,157 @@ async def finalize_response(user_id: int, lang: str, answers: Dict[str, Any]) ->
     True  -> сохранено (первый раз)
     False -> уже сдавал ранее (не сохраняем повторно)
     """
-    payload = json.dumps(answers, ensure_ascii=False)
-
-    async with aiosqlite.connect(DB_PATH) as db:
-        # если уже есть submissions.user_id -> повторно не вставится
-        cur = await db.execute(
-            "INSERT OR IGNORE INTO submissions(user_id, lang, answers_json) VALUES(?, ?, ?)",
-            (user_id, lang, payload),
-        )
-        await db.commit()
-
-        saved = cur.rowcount == 1
+    # с group commit транзакцию считает finalize_many, ожидание в очереди — не запрос к БД
+    if _finalize_queue is not None:
+        return await _finalize_queue.submit((user_id, lang, answers))
 
-        # старую таблицу responses можно НЕ трогать, но если хочешь —
-        # можем сохранять туда только если saved == True
-        if saved:
-            await db.execute(
-                "INSERT INTO responses(lang, answers_json) VALUES(?, ?)",
-                (lang, payload),
-            )
+    with DB_SECONDS.time(op="finalize_response"):
+        async with get_db().write() as db:
+            saved = await _finalize_in_tx(db, user_id, lang, answers)
             await db.commit()
+            _discard_progress((user_id,))
 
-        # прогресс удаляем в любом случае (чтобы не зависало)
-        await db.execute("DELETE FROM progress WHERE user_id=?", (user_id,))
-        await db.commit()
-
+    _remember_submitted((user_id,))
     return saved
 
 
+@db_timed
 async def load_all_responses() -> List[Tuple[str, Dict[str, Any]]]:
     out: List[Tuple[str, Dict[str, Any]]] = []
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with get_db().read() as db:
         cur = await db.execute("SELECT lang, answers_json FROM submissions")
         rows = await cur.fetchall()
 
         for lang, answers_json in rows:
             try:
-                out.append((lang, json.loads(answers_json)))
+                out.append((lang, decode_answers(answers_json)))
             except Exception:
                 pass
 
     return out
+
+
+@db_timed
+async def load_submission_rows() -> List[Tuple[str, Any]]:
+    """Сырые (lang, answers_json) из submissions без декодирования (для векторного подсчёта)."""
+    async with get_db().read() as db:
+        cur = await db.execute("SELECT lang, answers_json FROM submissions")
+        return list(await cur.fetchall())
+
+
+@db_timed
+async def submission_watermark() -> Tuple[int, int]:
+    """(max rowid, count) по submissions — меняется с каждой новой анкетой."""
+    async with get_db().read() as db:
+        cur = await db.execute("SELECT COALESCE(MAX(rowid), 0), COUNT(*) FROM submissions")
+        max_rowid, count = await cur.fetchone()
+    return int(max_rowid), int(count)
+
+
+def iter_submissions(path: str, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str, Any]]]:
+    """
+    Потоково отдаёт submissions пачками по chunk_size строк:
+    [(created_at, lang, answers_json), ...] — в памяти не больше одной пачки.
+    Синхронно, через своё read-only соединение: вызывается из пула задач
+    (utils.jobs) и не занимает читателей Database на время выгрузки.
+    """
+    con = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        cur = con.execute("SELECT created_at, lang, answers_json FROM submissions ORDER BY created_at, rowid")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        con.close()
+
+
+def _stats_from_rows(total_rows, count_rows):
+    totals = Counter()
+    stats: Dict[str, Dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+
+    for lang, cnt in total_rows:
+        totals["all"] += cnt
+        totals[lang] += cnt
+
+    for lang, q_idx, opt_idx, cnt in count_rows:
+        if not 0 <= q_idx < len(SURVEY):
+            continue
+        key = SURVEY[q_idx].key
+        stats["all"][key][opt_idx] += cnt
+        stats[lang][key][opt_idx] += cnt
+
+    return totals, stats
+
+
+_STATS_QUERIES = {
+    # материализованные счётчики: O(вопросы × варианты)
+    "counts": (
+        "SELECT lang, cnt FROM stats_totals",
+        "SELECT lang, q_idx, opt_idx, cnt FROM stats_counts",
+    ),
+    # GROUP BY по answer_items: O(ответы), но без разбора анкет в Python
+    "items": (
+        "SELECT lang, COUNT(*) FROM submissions GROUP BY lang",
+        "SELECT lang, q_idx, opt_idx, COUNT(*) FROM answer_items GROUP BY q_idx, opt_idx, lang",
+    ),
+}
+
+
+@db_timed
+async def load_stats(source: str = "counts"):
+    """
+    (totals, stats) как у handlers.admin.compute_stats, но без загрузки анкет в Python.
+    source: "counts" — из stats_counts/stats_totals, "items" — GROUP BY по answer_items.
+    """
+    totals_sql, counts_sql = _STATS_QUERIES[source]
+    async with get_db().read() as db:
+        cur = await db.execute(totals_sql)
+        total_rows = await cur.fetchall()
+        cur = await db.execute(counts_sql)
+        count_rows = await cur.fetchall()
+
+    return _stats_from_rows(total_rows, count_rows)
+
+
+@db_timed
+async def rebuild_stats_counts():
+    """Пересчитывает stats_counts/stats_totals с нуля из answer_items и submissions."""
+    async with get_db().write() as db:
+        await _rebuild_stats_counts(db)
+        await db.commit()
+
+
+@db_timed
+async def check_stats_counts() -> List[str]:
+    """
+    Сверяет материализованные счётчики с answer_items/submissions.
+    Возвращает список расхождений (пустой — всё сходится).
+    """
+    async with get_db().read() as db:
+        cur = await db.execute("""
+        SELECT lang, q_idx, opt_idx, SUM(m), SUM(a) FROM (
+            SELECT lang, q_idx, opt_idx, cnt AS m, 0 AS a FROM stats_counts
+            UNION ALL
+            SELECT lang, q_idx, opt_idx, 0 AS m, COUNT(*) AS a FROM answer_items GROUP BY lang, q_idx, opt_idx
+        )
+        GROUP BY lang, q_idx, opt_idx
+        HAVING SUM(m) != SUM(a)
+        """)
+        count_diff = await cur.fetchall()
+
+        cur = await db.execute("""
+        SELECT lang, SUM(m), SUM(a) FROM (
+            SELECT lang, cnt AS m, 0 AS a FROM stats_totals
+            UNION ALL
+            SELECT lang, 0 AS m, COUNT(*) AS a FROM submissions GROUP BY lang
+        )
+        GROUP BY lang
+        HAVING SUM(m) != SUM(a)
+        """)
+        total_diff = await cur.fetchall()
+
+    problems = [f"totals[{lang}]: {m} != {a}" for lang, m, a in total_diff]
+    problems += [f"{lang} q{q_idx + 1} opt{opt_idx}: {m} != {a}" for lang, q_idx, opt_idx, m, a in count_diff]
+    return problems
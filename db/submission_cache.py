@@ -0,0 +1,60 @@
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Iterable
+
+
+class SubmissionCache:
+    """
+    Кэш ответа на вопрос «уже сдавал?» по user_id.
+
+    Положительные ответы: отсортированный array('q') из прогрева на старте
+    + set для сдавших после старта (submissions пишутся один раз и не удаляются).
+    Отрицательные: ограниченный LRU. Если authoritative=True (все финализации
+    идут через этот процесс), то отсутствие в положительных уже означает «не сдавал».
+    """
+
+    def __init__(self, negative_size: int = 10000, authoritative: bool = True):
+        self.negative_size = max(0, negative_size)
+        self.authoritative = authoritative
+        self._base = array("q")
+        self._recent: set[int] = set()
+        self._negative: OrderedDict[int, None] = OrderedDict()
+        self.loaded = False
+
+    def load(self, sorted_ids: Iterable[int]):
+        self._base = array("q", sorted_ids)
+        self._recent.clear()
+        self._negative.clear()
+        self.loaded = True
+
+    def _in_base(self, user_id: int) -> bool:
+        i = bisect_left(self._base, user_id)
+        return i < len(self._base) and self._base[i] == user_id
+
+    def lookup(self, user_id: int) -> bool | None:
+        """True/False — ответ известен, None — нужно спросить БД."""
+        if user_id in self._recent or self._in_base(user_id):
+            return True
+        if self.loaded and self.authoritative:
+            return False
+        if user_id in self._negative:
+            self._negative.move_to_end(user_id)
+            return False
+        return None
+
+    def add(self, user_id: int):
+        self._negative.pop(user_id, None)
+        if not self._in_base(user_id):
+            self._recent.add(user_id)
+
+    def remember_missing(self, user_id: int):
+        if self.negative_size == 0:
+            return
+        self._negative[user_id] = None
+        self._negative.move_to_end(user_id)
+        while len(self._negative) > self.negative_size:
+            self._negative.popitem(last=False)
+
+    def __len__(self):
+        return len(self._base) + len(self._recent)
@@ -6,14 +6,31 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.types.input_file import FSInputFile
 
-from config import ADMIN_IDS
-from db.repo import load_all_responses
-from survey.questions import SURVEY, SECTION_TITLES
+from config import ADMIN_IDS, STATS_BACKEND, EXCEL_STREAMING, EXPORT_CACHE_ITEMS, EXPORT_CACHE_TTL, EXPORT_CACHE_GRACE
+from db.repo import (
+    load_all_responses,
+    load_submission_rows,
+    load_stats,
+    rebuild_stats_counts,
+    check_stats_counts,
+    get_db,
+    submission_watermark,
+)
+from survey.questions import SURVEY
+from survey.schema import SCHEMA
 from utils.long_text import send_long_text
-from utils.excel import build_excel_stats
+from utils.excel import build_excel_stats, build_excel_stats_stream
+from utils.export_cache import ExportCache
+from utils.fast_stats import HAS_NUMPY, compute_stats_rows
+from utils.jobs import JobQueueFull, get_jobs
+from utils.metrics import STATS_SECONDS, render as render_metrics
+from utils.profiling import get_profiler
+from utils.raw_export import EXPORT_FORMATS, export_raw
 
 router = Router()
 TOTAL_Q = len(SURVEY)
+BUSY_TEXT = "⚠️ Server band, keyinroq urinib ko‘ring / Сервер занят, попробуйте позже"
+export_cache = ExportCache(max_items=EXPORT_CACHE_ITEMS, ttl=EXPORT_CACHE_TTL, grace=EXPORT_CACHE_GRACE)
 
 
 def is_admin(user_id: int) -> bool:
@@ -48,6 +65,48 @@ def compute_stats(responses: List[Tuple[str, Dict[str, Any]]]):
     return totals, stats
 
 
+def plain_stats(totals, stats):
+    """
+    (totals, stats) без defaultdict/lambda — чтобы передавать между процессами пула.
+    Ключ "all" есть всегда (форматтеры обращаются к stats["all"] напрямую).
+    """
+    out = {lang: {key: Counter(c) for key, c in qs.items()} for lang, qs in stats.items()}
+    out.setdefault("all", {})
+    return Counter(totals), out
+
+
+def _compute_stats_job(responses):
+    return plain_stats(*compute_stats(responses))
+
+
+def _compute_stats_rows_job(rows):
+    return plain_stats(*compute_stats_rows(rows))
+
+
+def _build_excel_job(totals, stats, streaming: bool) -> str:
+    builder = build_excel_stats_stream if streaming else build_excel_stats
+    return builder(totals, stats)
+
+
+async def get_stats():
+    with STATS_SECONDS.time(kind=STATS_BACKEND):
+        return await _get_stats()
+
+
+async def _get_stats():
+    if STATS_BACKEND == "counts":
+        return await load_stats("counts")
+    if STATS_BACKEND == "sql":
+        return await load_stats("items")
+
+    # полный пересчёт — CPU-работа, уносим в пул, чтобы не тормозить респондентов
+    if STATS_BACKEND == "numpy" and HAS_NUMPY:
+        return await get_jobs().run(_compute_stats_rows_job, await load_submission_rows())
+
+    responses = await load_all_responses()
+    return await get_jobs().run(_compute_stats_job, responses)
+
+
 def _pick_lang(text: str | None) -> str:
     args = (text or "").split()
     if len(args) > 1 and args[1].lower() in ("ru", "uz"):
@@ -55,14 +114,6 @@ def _pick_lang(text: str | None) -> str:
     return "uz"
 
 
-def _section_title(q_num: int, lang: str) -> str | None:
-    last = None
-    for start_q, titles in SECTION_TITLES.items():
-        if q_num >= start_q:
-            last = titles.get(lang)
-    return last
-
-
 def _safe_opt(opts: List[str], idx: int) -> str:
     if 0 <= idx < len(opts):
         return opts[idx]
@@ -83,8 +134,8 @@ def format_stats_short(totals, stats, lang: str) -> str:
         counter = stats["all"].get(q.key, Counter())
         q_total = sum(counter.values())
 
-        q_text = q.text_ru if lang == "ru" else q.text_uz
-        opts = q.options_ru if lang == "ru" else q.options_uz
+        q_text = SCHEMA.text(i, lang)
+        opts = SCHEMA.options(i, lang)
 
         lines.append(f"*{i+1}.* {q_text}")
 
@@ -115,7 +166,7 @@ def format_stats_full(totals, stats, lang: str) -> str:
 
     for i, q in enumerate(SURVEY):
         q_num = i + 1
-        sec = _section_title(q_num, lang)
+        sec = SCHEMA.section_title(i, lang)
 
         if sec != current_section and sec:
             current_section = sec
@@ -124,8 +175,8 @@ def format_stats_full(totals, stats, lang: str) -> str:
             lines.append("━━━━━━━━━━━━━━━━━━━━")
             lines.append("")
 
-        q_text = q.text_ru if lang == "ru" else q.text_uz
-        opts = q.options_ru if lang == "ru" else q.options_uz
+        q_text = SCHEMA.text(i, lang)
+        opts = SCHEMA.options(i, lang)
 
         counter = stats["all"].get(q.key, Counter())
         q_total = sum(counter.values())
@@ -165,8 +216,11 @@ async def stats_short(message: Message):
         return
 
     lang = _pick_lang(message.text)
-    responses = await load_all_responses()
-    totals, stats = compute_stats(responses)
+    try:
+        totals, stats = await get_stats()
+    except JobQueueFull:
+        await message.answer(BUSY_TEXT)
+        return
 
     text = format_stats_short(totals, stats, lang)
     await send_long_text(message, text)
@@ -178,8 +232,11 @@ async def stats_full(message: Message):
         return
 
     lang = _pick_lang(message.text)
-    responses = await load_all_responses()
-    totals, stats = compute_stats(responses)
+    try:
+        totals, stats = await get_stats()
+    except JobQueueFull:
+        await message.answer(BUSY_TEXT)
+        return
 
     text = format_stats_full(totals, stats, lang)
     await send_long_text(message, text)
@@ -190,11 +247,136 @@ async def export_stats(message: Message):
     if not is_admin(message.from_user.id):
         return
 
-    responses = await load_all_responses()
-    totals, stats = compute_stats(responses)
+    async def build() -> str:
+        totals, stats = await get_stats()
+        with STATS_SECONDS.time(kind="excel"):
+            return await get_jobs().run(_build_excel_job, *plain_stats(totals, stats), EXCEL_STREAMING)
+
+    key = (await submission_watermark(), "stats_xlsx", "all")
+
+    busy = get_jobs().pending
+    status = await message.answer(
+        "⏳ Fayl tayyorlanmoqda / Готовлю файл…"
+        + (f"\n(navbatda / в очереди: {busy})" if busy else "")
+    )
+    try:
+        path = await export_cache.get_or_build(key, ".xlsx", build)
+    except JobQueueFull:
+        await status.edit_text(BUSY_TEXT)
+        return
+
+    try:
+        await status.delete()
+    except Exception:
+        pass
 
-    path = build_excel_stats(totals, stats)
     await message.answer_document(
         FSInputFile(path, filename="survey_stats.xlsx"),
         caption="📎 Survey Statistics (1–30, anonymous)",
     )
+
+
+async def _timed_raw_export(fmt: str, lang: str) -> str:
+    # в пуле задач, со своим соединением: читатели БД остаются респондентам
+    with STATS_SECONDS.time(kind=f"raw_{fmt}"):
+        return await get_jobs().run(export_raw, get_db().path, fmt, lang)
+
+
+@router.message(Command("export_raw"))
+async def export_raw_cmd(message: Message):
+    """/export_raw [uz|ru] [xlsx|csv|parquet] — все анкеты построчно (анонимно)."""
+    if not is_admin(message.from_user.id):
+        return
+
+    args = (message.text or "").lower().split()[1:]
+    lang = "ru" if "ru" in args else "uz"
+    fmt = next((a for a in args if a in EXPORT_FORMATS), "xlsx")
+
+    key = (await submission_watermark(), f"raw_{fmt}", lang)
+    try:
+        path = await export_cache.get_or_build(key, f".{fmt}", lambda: _timed_raw_export(fmt, lang))
+    except JobQueueFull:
+        await message.answer(BUSY_TEXT)
+        return
+    except RuntimeError as e:
+        await message.answer(f"⚠️ {e}")
+        return
+
+    await message.answer_document(
+        FSInputFile(path, filename=f"survey_raw_{lang}.{fmt}"),
+        caption="📎 Survey raw answers (anonymous)",
+    )
+
+
+@router.message(Command("stats_rebuild"))
+async def stats_rebuild(message: Message):
+    if not is_admin(message.from_user.id):
+        return
+
+    await rebuild_stats_counts()
+    await message.answer("✅ stats_counts qayta hisoblandi / пересчитаны")
+
+
+@router.message(Command("stats_check"))
+async def stats_check(message: Message):
+    if not is_admin(message.from_user.id):
+        return
+
+    problems = await check_stats_counts()
+    if not problems:
+        await message.answer("✅ stats_counts: OK")
+        return
+
+    text = "⚠️ stats_counts: расхождения\n" + "\n".join(problems) + "\n\n/stats_rebuild"
+    await send_long_text(message, text)
+
+
+@router.message(Command("metrics"))
+async def metrics_cmd(message: Message):
+    """/metrics [префикс] — метрики процесса (как на HTTP /metrics), без HELP/TYPE."""
+    if not is_admin(message.from_user.id):
+        return
+
+    args = (message.text or "").split()[1:]
+    prefix = args[0] if args else ""
+    lines = [
+        line for line in render_metrics().splitlines()
+        if line and not line.startswith("#") and line.startswith(prefix) and "_bucket{" not in line
+    ]
+    await send_long_text(message, "\n".join(lines) or "—")
+
+
+@router.message(Command("profile"))
+async def profile_cmd(message: Message):
+    """
+    /profile — top-N горячих функций по сэмплам;
+    /profile every N | user ID | off | reset — управление сэмплированием.
+    """
+    if not is_admin(message.from_user.id):
+        return
+
+    profiler = get_profiler()
+    if profiler is None:
+        await message.answer("profile: недоступен")
+        return
+
+    args = (message.text or "").split()[1:]
+    cmd = args[0].lower() if args else ""
+    value = int(args[1]) if len(args) > 1 and args[1].isdigit() else None
+
+    if cmd == "every" and value is not None:
+        profiler.configure(every=value)
+    elif cmd == "user" and value is not None:
+        profiler.configure(user_id=value)
+    elif cmd == "off":
+        profiler.configure(every=0, user_id=0)
+    elif cmd == "reset":
+        profiler.reset()
+    elif cmd:
+        await message.answer("/profile [every N | user ID | off | reset]")
+        return
+    else:
+        await send_long_text(message, profiler.report())
+        return
+
+    await message.answer(f"profile: every={profiler.every} user_id={profiler.user_id or '-'} samples={profiler.samples}")
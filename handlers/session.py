@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+from db.repo import has_submission, load_progress, save_progress
+from survey.schema import SCHEMA
+
+
+@dataclass
+class UserSession:
+    """
+    Состояние пользователя на время обработки одного апдейта.
+    Загружается один раз в SessionMiddleware и сохраняется один раз в конце,
+    если что-то поменялось (dirty).
+    """
+
+    user_id: int
+    lang: str = "uz"
+    q_index: int = 0
+    answers: Dict[str, Any] = field(default_factory=dict)
+    last_msg_id: Optional[int] = None
+    # бит i = на вопрос i есть ответ (SCHEMA.mask_of(answers)), хранится в progress
+    answered_mask: int = 0
+    submitted: bool = False
+    dirty: bool = False
+
+    def reset(self, lang: str):
+        self.lang = lang
+        self.q_index = 0
+        self.answers = {}
+        self.last_msg_id = None
+        self.answered_mask = 0
+        self.dirty = True
+
+    def set_answer(self, key: str, opt_index: int):
+        self.answers[key] = opt_index
+        i = SCHEMA.index.get(key)
+        if i is not None:
+            self.answered_mask |= 1 << i
+        self.dirty = True
+
+    @property
+    def all_answered(self) -> bool:
+        return self.answered_mask == SCHEMA.full_mask
+
+    def first_unanswered(self) -> int | None:
+        return SCHEMA.first_missing(self.answered_mask)
+
+    def missing(self) -> list[int]:
+        return SCHEMA.missing(self.answered_mask)
+
+    def move(self, q_index: int, last_msg_id: Optional[int]):
+        if q_index != self.q_index or last_msg_id != self.last_msg_id:
+            self.q_index = q_index
+            self.last_msg_id = last_msg_id
+            self.dirty = True
+
+    def mark_submitted(self):
+        # finalize_response уже удалил progress — сохранять нечего
+        self.submitted = True
+        self.dirty = False
+
+
+async def load_session(user_id: int) -> UserSession:
+    session = UserSession(user_id=user_id, submitted=await has_submission(user_id))
+    progress = await load_progress(user_id)
+    if progress is not None:
+        session.lang, session.q_index, session.answers, session.last_msg_id, session.answered_mask = progress
+    return session
+
+
+async def persist_session(session: UserSession):
+    if session.dirty and not session.submitted:
+        await save_progress(
+            session.user_id,
+            session.lang,
+            session.q_index,
+            session.answers,
+            session.last_msg_id,
+            session.answered_mask,
+        )
+        session.dirty = False
+
+
+class SessionMiddleware(BaseMiddleware):
+    """Кладёт UserSession в data["session"] и сохраняет её после хендлера."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        session = await load_session(user.id)
+        data["session"] = session
+        try:
+            return await handler(event, data)
+        finally:
+            await persist_session(session)
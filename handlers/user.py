@@ -1,19 +1,31 @@
 from aiogram import Router, F
 from aiogram.filters import CommandStart, Command
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, CallbackQuery
 
-from db.repo import (
-    set_lang_and_reset,
-    get_progress,
-    save_progress,
-    finalize_response,
-    has_submission,
-)
-from survey.questions import SURVEY, get_section_title, get_survey_header
-from survey.text import get_text_and_opts, thanks
-from ui.keyboards import kb_lang, kb_single
+from db.repo import finalize_response
+from config import RENDER_FINGERPRINTS, USER_QUEUE_MAX
+from handlers.session import SessionMiddleware, UserSession
+from handlers.user_lock import UserLockMiddleware
+from survey.questions import SURVEY
+from survey.text import thanks
+from ui.keyboards import kb_lang
+from ui.screens import question_screen
+from utils.metrics import EDIT_FALLBACKS, gauge
+from utils.render_fingerprint import RenderFingerprints
 
 router = Router()
+# один лок на пользователя для сообщений и колбэков; сессия грузится уже под ним
+user_lock = UserLockMiddleware(USER_QUEUE_MAX)
+router.message.middleware(user_lock)
+router.callback_query.middleware(user_lock)
+router.message.middleware(SessionMiddleware())
+router.callback_query.middleware(SessionMiddleware())
+
+# что сейчас показано в живом сообщении пользователя — чтобы не слать одинаковые edit
+fingerprints = RenderFingerprints(RENDER_FINGERPRINTS)
+
+gauge("bot_user_lock_slots", "Users with updates in flight", lambda: len(user_lock))
 
 
 def already_done_text(lang: str) -> str:
@@ -31,43 +43,38 @@ def already_done_text(lang: str) -> str:
 
 
 @router.message(CommandStart())
-async def start(message: Message):
+async def start(message: Message, session: UserSession):
     # если уже сдавал — не даём начать заново
-    if await has_submission(message.from_user.id):
+    if session.submitted:
         # язык берём из progress если есть, иначе uz
-        lang, _, _, _ = await get_progress(message.from_user.id)
-        await message.answer(already_done_text(lang), reply_markup=None)
+        await message.answer(already_done_text(session.lang), reply_markup=None)
         return
 
     await message.answer("Til / Язык:", reply_markup=kb_lang())
 
 
 @router.message(Command("restart"))
-async def restart(message: Message):
-    if await has_submission(message.from_user.id):
-        lang, _, _, _ = await get_progress(message.from_user.id)
-        await message.answer(already_done_text(lang), reply_markup=None)
+async def restart(message: Message, session: UserSession):
+    if session.submitted:
+        await message.answer(already_done_text(session.lang), reply_markup=None)
         return
 
     await message.answer("Til / Язык:", reply_markup=kb_lang())
 
 
 @router.callback_query(F.data.startswith("lang:"))
-async def on_lang(call: CallbackQuery):
-    user_id = call.from_user.id
-
+async def on_lang(call: CallbackQuery, session: UserSession):
     # если уже сдавал — блокируем выбор языка
-    if await has_submission(user_id):
-        lang, _, _, _ = await get_progress(user_id)
+    if session.submitted:
         await call.answer()
         try:
-            await call.message.edit_text(already_done_text(lang))
+            await call.message.edit_text(already_done_text(session.lang))
         except Exception:
-            await call.bot.send_message(call.message.chat.id, already_done_text(lang))
+            await call.bot.send_message(call.message.chat.id, already_done_text(session.lang))
         return
 
     lang = call.data.split(":")[1]
-    await set_lang_and_reset(user_id, lang)
+    session.reset(lang)
 
     try:
         await call.message.delete()
@@ -77,7 +84,7 @@ async def on_lang(call: CallbackQuery):
     await call.answer()
 
     await send_question(
-        user_id=user_id,
+        session=session,
         chat_id=call.message.chat.id,
         bot=call.bot,
         q_index=0,
@@ -85,10 +92,12 @@ async def on_lang(call: CallbackQuery):
     )
 
 
-async def send_question(user_id: int, chat_id: int, bot, q_index: int | None, edit_msg_id: int | None):
+async def send_question(session: UserSession, chat_id: int, bot, q_index: int | None, edit_msg_id: int | None):
+    lang = session.lang
+    answers = session.answers
+
     # если уже сдавал — не показываем вопросы
-    if await has_submission(user_id):
-        lang, _, _, _ = await get_progress(user_id)
+    if session.submitted:
         if edit_msg_id:
             try:
                 await bot.edit_message_text(
@@ -103,15 +112,18 @@ async def send_question(user_id: int, chat_id: int, bot, q_index: int | None, ed
         await bot.send_message(chat_id, already_done_text(lang), reply_markup=None)
         return
 
-    lang, cur_q_index, answers, last_msg_id = await get_progress(user_id)
+    cur_q_index = session.q_index
+    last_msg_id = session.last_msg_id
 
     if q_index is not None:
         cur_q_index = q_index
 
     # если индекс вышел за пределы
     if cur_q_index >= len(SURVEY):
-        if all(q.key in answers for q in SURVEY):
-            saved = await finalize_response(user_id, lang, answers)
+        if session.all_answered:
+            saved = await finalize_response(session.user_id, lang, answers)
+            session.mark_submitted()
+            fingerprints.forget(session.user_id)
             if saved:
                 await bot.send_message(chat_id, thanks(lang), reply_markup=None)
             else:
@@ -119,52 +131,17 @@ async def send_question(user_id: int, chat_id: int, bot, q_index: int | None, ed
             return
 
         # найдём первый неотвеченный
-        for i, q in enumerate(SURVEY):
-            if q.key not in answers:
-                cur_q_index = i
-                break
+        cur_q_index = session.first_unanswered()
 
     q = SURVEY[cur_q_index]
-    q_text, opts = get_text_and_opts(q, lang)
-
-    selected_opt = answers.get(q.key)
-    all_answered = all(sq.key in answers for sq in SURVEY)
-
-    header = get_survey_header(lang)
-    section = get_section_title(cur_q_index, lang)
-
-    lines = []
-    lines.append(header)
-    lines.append("────────────────────")
-    lines.append(f"📋 *Savol / Вопрос:* {cur_q_index + 1}/{len(SURVEY)}")
-    if section:
-        lines.append(f"🧩 *{section}*")
-    lines.append("────────────────────")
-    lines.append(q_text)
-
-    if isinstance(selected_opt, int):
-        try:
-            lines.append("")
-            lines.append(
-                "✅ *"
-                + ("Tanlangan" if lang == "uz" else "Выбрано")
-                + f":* {opts[selected_opt]}"
-            )
-        except Exception:
-            pass
-
-    text = "\n".join(lines)
-
-    inline = kb_single(
-        q_index=cur_q_index,
-        opts=opts,
-        selected_opt=selected_opt if isinstance(selected_opt, int) else None,
-        total=len(SURVEY),
-        all_answered=all_answered,
-    )
+    text, inline, fingerprint = question_screen(cur_q_index, lang, answers.get(q.key), session.all_answered)
 
     # всегда пытаемся редактировать текущее сообщение (чтобы не было "пустых")
     if edit_msg_id:
+        if fingerprints.same(session.user_id, edit_msg_id, fingerprint):
+            # на экране уже ровно это — запрос не нужен
+            session.move(cur_q_index, edit_msg_id)
+            return
         try:
             await bot.edit_message_text(
                 text,
@@ -172,10 +149,16 @@ async def send_question(user_id: int, chat_id: int, bot, q_index: int | None, ed
                 message_id=edit_msg_id,
                 reply_markup=inline,
             )
-            await save_progress(user_id, lang, cur_q_index, answers, edit_msg_id)
-            return
+            edited = True
+        except TelegramBadRequest as e:
+            edited = "message is not modified" in str(e)
         except Exception:
-            pass
+            edited = False
+        if edited:
+            fingerprints.remember(session.user_id, edit_msg_id, fingerprint)
+            session.move(cur_q_index, edit_msg_id)
+            return
+        EDIT_FALLBACKS.inc()
 
     # если не удалось редактировать — тогда удалим старое и отправим новое
     if last_msg_id:
@@ -185,20 +168,33 @@ async def send_question(user_id: int, chat_id: int, bot, q_index: int | None, ed
             pass
 
     msg = await bot.send_message(chat_id, text, reply_markup=inline)
-    await save_progress(user_id, lang, cur_q_index, answers, msg.message_id)
+    fingerprints.remember(session.user_id, msg.message_id, fingerprint)
+    session.move(cur_q_index, msg.message_id)
+
+
+async def resync_stale_tap(call: CallbackQuery, session: UserSession, q_index: int) -> bool:
+    """
+    Тап по клавиатуре не текущего вопроса: повторный тап или progress в БД отстал
+    от сообщения на экране (потерянный буфер, рестарт воркера). Перерисовываем
+    session.q_index в это же сообщение; при двойном тапе фингерпринт делает это no-op.
+    True — тап обработан.
+    """
+    if q_index == session.q_index:
+        return False
+    await call.answer()
+    await send_question(session, call.message.chat.id, call.bot, q_index=session.q_index, edit_msg_id=call.message.message_id)
+    return True
 
 
 @router.callback_query(F.data.startswith("ans:"))
-async def on_single_answer(call: CallbackQuery):
-    user_id = call.from_user.id
+async def on_single_answer(call: CallbackQuery, session: UserSession):
     chat_id = call.message.chat.id
 
     # если уже сдавал — просто покажем сообщение
-    if await has_submission(user_id):
-        lang, _, _, _ = await get_progress(user_id)
+    if session.submitted:
         await call.answer()
         try:
-            await call.message.edit_text(already_done_text(lang))
+            await call.message.edit_text(already_done_text(session.lang))
         except Exception:
             pass
         return
@@ -207,23 +203,28 @@ async def on_single_answer(call: CallbackQuery):
     q_index = int(q_index_str)
     opt_index = int(opt_index_str)
 
-    lang, _, answers, _ = await get_progress(user_id)
+    if await resync_stale_tap(call, session, q_index):
+        return
+
+    lang = session.lang
+    answers = session.answers
 
     q = SURVEY[q_index]
-    answers[q.key] = opt_index
-
-    await save_progress(user_id, lang, q_index, answers, call.message.message_id)
+    session.set_answer(q.key, opt_index)
+    session.move(q_index, call.message.message_id)
     await call.answer()
 
     next_index = q_index + 1
 
     if next_index < len(SURVEY):
-        await send_question(user_id, chat_id, call.bot, q_index=next_index, edit_msg_id=call.message.message_id)
+        await send_question(session, chat_id, call.bot, q_index=next_index, edit_msg_id=call.message.message_id)
         return
 
     # конец опроса
-    if all(sq.key in answers for sq in SURVEY):
-        saved = await finalize_response(user_id, lang, answers)
+    if session.all_answered:
+        saved = await finalize_response(session.user_id, lang, answers)
+        session.mark_submitted()
+        fingerprints.forget(session.user_id)
         try:
             if saved:
                 await call.message.edit_text(thanks(lang), reply_markup=None)
@@ -234,74 +235,74 @@ async def on_single_answer(call: CallbackQuery):
         return
 
     # если вдруг кто-то пропустил — идём на первый пропущенный
-    for i, sq in enumerate(SURVEY):
-        if sq.key not in answers:
-            await send_question(user_id, chat_id, call.bot, q_index=i, edit_msg_id=call.message.message_id)
-            break
+    first = session.first_unanswered()
+    if first is not None:
+        await send_question(session, chat_id, call.bot, q_index=first, edit_msg_id=call.message.message_id)
 
 
 @router.callback_query(F.data.startswith("nav:prev:"))
-async def on_nav_prev(call: CallbackQuery):
-    user_id = call.from_user.id
+async def on_nav_prev(call: CallbackQuery, session: UserSession):
     chat_id = call.message.chat.id
 
-    if await has_submission(user_id):
-        lang, _, _, _ = await get_progress(user_id)
+    if session.submitted:
         await call.answer()
         try:
-            await call.message.edit_text(already_done_text(lang), reply_markup=None)
+            await call.message.edit_text(already_done_text(session.lang), reply_markup=None)
         except Exception:
             pass
         return
 
     q_index = int(call.data.split(":")[2])
+    if await resync_stale_tap(call, session, q_index):
+        return
     await call.answer()
     if q_index > 0:
-        await send_question(user_id, chat_id, call.bot, q_index=q_index - 1, edit_msg_id=call.message.message_id)
+        await send_question(session, chat_id, call.bot, q_index=q_index - 1, edit_msg_id=call.message.message_id)
 
 
 @router.callback_query(F.data.startswith("nav:next:"))
-async def on_nav_next(call: CallbackQuery):
-    user_id = call.from_user.id
+async def on_nav_next(call: CallbackQuery, session: UserSession):
     chat_id = call.message.chat.id
 
-    if await has_submission(user_id):
-        lang, _, _, _ = await get_progress(user_id)
+    if session.submitted:
         await call.answer()
         try:
-            await call.message.edit_text(already_done_text(lang), reply_markup=None)
+            await call.message.edit_text(already_done_text(session.lang), reply_markup=None)
         except Exception:
             pass
         return
 
     q_index = int(call.data.split(":")[2])
+    if await resync_stale_tap(call, session, q_index):
+        return
     await call.answer()
     if q_index < len(SURVEY) - 1:
-        await send_question(user_id, chat_id, call.bot, q_index=q_index + 1, edit_msg_id=call.message.message_id)
+        await send_question(session, chat_id, call.bot, q_index=q_index + 1, edit_msg_id=call.message.message_id)
 
 
 @router.callback_query(F.data == "nav:finish")
-async def on_nav_finish(call: CallbackQuery):
-    user_id = call.from_user.id
+async def on_nav_finish(call: CallbackQuery, session: UserSession):
     chat_id = call.message.chat.id
 
-    if await has_submission(user_id):
-        lang, _, _, _ = await get_progress(user_id)
+    if session.submitted:
         await call.answer()
         try:
-            await call.message.edit_text(already_done_text(lang), reply_markup=None)
+            await call.message.edit_text(already_done_text(session.lang), reply_markup=None)
         except Exception:
             pass
         return
 
-    lang, _, answers, _ = await get_progress(user_id)
+    lang = session.lang
+    answers = session.answers
 
-    if not all(q.key in answers for q in SURVEY):
-        missing = [i + 1 for i, q in enumerate(SURVEY) if q.key not in answers]
+    if not session.all_answered:
+        missing = [i + 1 for i in session.missing()]
         await call.answer("Не отвечены: " + ", ".join(map(str, missing)), show_alert=True)
         return
 
-    saved = await finalize_response(user_id, lang, answers)
+    saved = await finalize_response(session.user_id, lang, answers)
+    session.mark_submitted()
+    fingerprints.forget(session.user_id)
     await call.answer()
 
     try:
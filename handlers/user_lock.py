@@ -0,0 +1,88 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, User
+
+logger = logging.getLogger(__name__)
+
+
+class _UserSlot:
+    __slots__ = ("lock", "users", "last_nav")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0  # сколько апдейтов держат или ждут лок
+        self.last_nav = 0  # номер последнего nav-тапа пользователя
+
+
+def _is_nav(event: TelegramObject) -> bool:
+    return isinstance(event, CallbackQuery) and (event.data or "").startswith("nav:")
+
+
+class UserLockMiddleware(BaseMiddleware):
+    """
+    Обрабатывает апдейты одного пользователя строго по очереди, разных — параллельно.
+    Регистрируется перед SessionMiddleware, чтобы загрузка и сохранение UserSession
+    шли под локом (иначе двойной тап теряет ответы).
+
+    - слот пользователя живёт, пока есть апдейты в работе или в очереди,
+      и удаляется сразу после последнего — память = O(активных пользователей);
+    - в очереди одного пользователя не больше max_pending апдейтов, лишние
+      тапы отбрасываются;
+    - nav-тап, за которым в очереди уже стоит более новый nav-тап, пропускается.
+
+    Один экземпляр нужно вешать и на message, и на callback_query.
+    """
+
+    def __init__(self, max_pending: int = 8):
+        self.max_pending = max(1, max_pending)
+        self._slots: Dict[int, _UserSlot] = {}
+        self._seq = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    async def _skip(self, event: TelegramObject):
+        if isinstance(event, CallbackQuery):
+            try:
+                await event.answer()
+            except Exception:
+                pass
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        slot = self._slots.get(user.id)
+        if slot is None:
+            slot = self._slots[user.id] = _UserSlot()
+        elif slot.users >= self.max_pending:
+            logger.debug("user %s: queue is full, update dropped", user.id)
+            await self._skip(event)
+            return None
+
+        nav_seq = 0
+        if _is_nav(event):
+            nav_seq = slot.last_nav = next(self._seq)
+
+        slot.users += 1
+        try:
+            async with slot.lock:
+                if nav_seq and nav_seq != slot.last_nav:
+                    # пока ждали, пришёл более новый nav-тап — этот устарел
+                    await self._skip(event)
+                    return None
+                return await handler(event, data)
+        finally:
+            slot.users -= 1
+            if slot.users == 0 and self._slots.get(user.id) is slot:
+                del self._slots[user.id]
@@ -1,2 +1,3 @@
 from .questions import SURVEY
 from .models import Question
+from .schema import SCHEMA, Section, SurveySchema
@@ -48,15 +48,6 @@ SECTION_TITLES = {
 }
 
 
-def get_section_title(q_index: int, lang: str) -> str | None:
-    q_num = q_index + 1
-    last_title = None
-    for start_q, titles in SECTION_TITLES.items():
-        if q_num >= start_q:
-            last_title = titles.get(lang)
-    return last_title
-
-
 def get_survey_header(lang: str) -> str:
     """
     Заголовок опроса убран по требованию.
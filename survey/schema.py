@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from survey.models import Question
+from survey.questions import SECTION_TITLES, SURVEY
+
+LANGS = ("uz", "ru")
+
+
+@dataclass(frozen=True)
+class Section:
+    number: int  # 1-based номер раздела
+    start: int  # индекс первого вопроса (0-based)
+    end: int  # индекс последнего вопроса включительно
+    titles: Dict[str, str]
+
+
+class SurveySchema:
+    """
+    Опрос, «скомпилированный» один раз при импорте: всё, что раньше искалось
+    проходом по SURVEY / SECTION_TITLES, берётся по индексу.
+    Разделы строятся только из SECTION_TITLES (ключ — номер первого вопроса).
+    """
+
+    def __init__(self, questions: List[Question], section_titles: Dict[int, Dict[str, str]]):
+        self.questions: Tuple[Question, ...] = tuple(questions)
+        self.size = len(self.questions)
+        self.keys: Tuple[str, ...] = tuple(q.key for q in self.questions)
+        self.index: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+        # бит i = на вопрос i есть ответ
+        self.full_mask = (1 << self.size) - 1
+
+        self._texts: Dict[str, Tuple[str, ...]] = {
+            "uz": tuple(q.text_uz for q in self.questions),
+            "ru": tuple(q.text_ru for q in self.questions),
+        }
+        self._options: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+            "uz": tuple(tuple(q.options_uz) for q in self.questions),
+            "ru": tuple(tuple(q.options_ru) for q in self.questions),
+        }
+        self.n_options: Tuple[int, ...] = tuple(max(len(q.options_uz), len(q.options_ru)) for q in self.questions)
+
+        starts = sorted(section_titles)
+        self.sections: Tuple[Section, ...] = tuple(
+            Section(
+                number=n,
+                start=start - 1,
+                end=(starts[n] - 2) if n < len(starts) else self.size - 1,
+                titles=dict(section_titles[start]),
+            )
+            for n, start in enumerate(starts, 1)
+        )
+        # вопрос -> раздел (None для вопросов до первого раздела)
+        self.section_of: Tuple[Section | None, ...] = tuple(
+            next((s for s in self.sections if s.start <= i <= s.end), None) for i in range(self.size)
+        )
+
+    @staticmethod
+    def _lang(lang: str) -> str:
+        # как get_text_and_opts: всё, что не ru, — uz
+        return "ru" if lang == "ru" else "uz"
+
+    def text(self, q_index: int, lang: str) -> str:
+        return self._texts[self._lang(lang)][q_index]
+
+    def options(self, q_index: int, lang: str) -> Tuple[str, ...]:
+        return self._options[self._lang(lang)][q_index]
+
+    def section_title(self, q_index: int, lang: str) -> str | None:
+        """Заголовок раздела вопроса; None — нет раздела или неизвестный язык."""
+        if not 0 <= q_index < self.size:
+            return None
+        section = self.section_of[q_index]
+        return section.titles.get(lang) if section is not None else None
+
+    # --- маска отвеченных вопросов ---
+
+    def mask_of(self, answers: Dict[str, Any]) -> int:
+        mask = 0
+        for key in answers:
+            i = self.index.get(key)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def first_missing(self, mask: int) -> int | None:
+        """Индекс первого неотвеченного вопроса (младший нулевой бит) или None."""
+        i = ((mask + 1) & ~mask).bit_length() - 1
+        return i if i < self.size else None
+
+    def missing(self, mask: int) -> List[int]:
+        """Индексы всех неотвеченных вопросов."""
+        rest = ~mask & self.full_mask
+        out = []
+        while rest:
+            low = rest & -rest
+            out.append(low.bit_length() - 1)
+            rest ^= low
+        return out
+
+
+SCHEMA = SurveySchema(SURVEY, SECTION_TITLES)
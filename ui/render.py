@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Tuple
 
 from survey.questions import SURVEY
+from survey.schema import SCHEMA
 from survey.text import intro
 
 
@@ -10,31 +11,9 @@ def get_text_and_opts(q, lang: str):
     return q.text_uz, q.options_uz
 
 
-SECTION_RU = [
-    ("I", 0, 4, "Характеристика респондента"),
-    ("II", 5, 9, "Потребность в кредите и использование"),
-    ("III", 10, 14, "Основные проблемы кредитования"),
-    ("IV", 15, 19, "Институциональные и системные вопросы"),
-    ("V", 20, 24, "Решения и предложения"),
-    ("VI", 25, 29, "Итоговая оценка"),
-]
-
-SECTION_UZ = [
-    ("I", 0, 4, "Respondentlarning tavsifi"),
-    ("II", 5, 9, "Kreditga ehtiyoj va foydalanish"),
-    ("III", 10, 14, "Kreditlashdagi asosiy muammolar"),
-    ("IV", 15, 19, "Institutsional va tizimli muammolar"),
-    ("V", 20, 24, "Yechimlar va takliflar"),
-    ("VI", 25, 29, "Yakuniy baholash"),
-]
-
-
 def _section_for_index(lang: str, q_index: int) -> str:
-    items = SECTION_RU if lang == "ru" else SECTION_UZ
-    for roman, a, b, title in items:
-        if a <= q_index <= b:
-            return f"*{roman}. {title}*"
-    return ""
+    title = SCHEMA.section_title(q_index, lang)
+    return f"*{title}*" if title else ""
 
 
 def render_question(
@@ -0,0 +1,99 @@
+from typing import Dict, NamedTuple, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from survey.questions import SURVEY, get_survey_header
+from survey.schema import LANGS, SCHEMA
+from ui.keyboards import kb_single
+from utils.render_fingerprint import render_fingerprint
+
+
+class QuestionScreen(NamedTuple):
+    text: str
+    markup: InlineKeyboardMarkup
+    fingerprint: bytes
+
+
+def render_question_screen(
+    q_index: int,
+    lang: str,
+    selected_opt: int | None,
+    all_answered: bool,
+) -> Tuple[str, InlineKeyboardMarkup]:
+    """Собирает текст и клавиатуру экрана вопроса с нуля."""
+    q_text = SCHEMA.text(q_index, lang)
+    opts = list(SCHEMA.options(q_index, lang))
+
+    header = get_survey_header(lang)
+    section = SCHEMA.section_title(q_index, lang)
+
+    lines = []
+    lines.append(header)
+    lines.append("────────────────────")
+    lines.append(f"📋 *Savol / Вопрос:* {q_index + 1}/{len(SURVEY)}")
+    if section:
+        lines.append(f"🧩 *{section}*")
+    lines.append("────────────────────")
+    lines.append(q_text)
+
+    if isinstance(selected_opt, int):
+        try:
+            lines.append("")
+            lines.append(
+                "✅ *"
+                + ("Tanlangan" if lang == "uz" else "Выбрано")
+                + f":* {opts[selected_opt]}"
+            )
+        except Exception:
+            pass
+
+    text = "\n".join(lines)
+
+    inline = kb_single(
+        q_index=q_index,
+        opts=opts,
+        selected_opt=selected_opt if isinstance(selected_opt, int) else None,
+        total=len(SURVEY),
+        all_answered=all_answered,
+    )
+    return text, inline
+
+
+# (q_index, lang, selected_opt | None, all_answered) -> готовый экран
+_SCREENS: Dict[Tuple[int, str, int | None, bool], QuestionScreen] = {}
+
+
+def warm_question_screens() -> int:
+    """
+    Заранее рендерит все состояния: вопрос × язык × (выбранный вариант или ничего)
+    × (все ли отвечены). Возвращает число экранов.
+    """
+    screens = {}
+    for q_index in range(SCHEMA.size):
+        for lang in LANGS:
+            for selected in (None, *range(len(SCHEMA.options(q_index, lang)))):
+                for all_answered in (False, True):
+                    text, markup = render_question_screen(q_index, lang, selected, all_answered)
+                    screens[(q_index, lang, selected, all_answered)] = QuestionScreen(
+                        text, markup, render_fingerprint(text, markup)
+                    )
+    _SCREENS.clear()
+    _SCREENS.update(screens)
+    return len(_SCREENS)
+
+
+def question_screen(q_index: int, lang: str, selected_opt, all_answered: bool) -> QuestionScreen:
+    """
+    Экран вопроса из кэша. Разметку нельзя менять — объект общий для всех.
+    Нестандартные состояния (чужой язык, старый list-ответ) рендерятся на лету.
+    """
+    if not _SCREENS:
+        warm_question_screens()
+
+    if selected_opt is not None and type(selected_opt) is not int:
+        selected_opt = None
+    screen = _SCREENS.get((q_index, lang, selected_opt, all_answered))
+    if screen is None:
+        text, markup = render_question_screen(q_index, lang, selected_opt, all_answered)
+        screen = QuestionScreen(text, markup, render_fingerprint(text, markup))
+    return screen
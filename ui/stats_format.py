@@ -2,40 +2,15 @@ from collections import Counter
 from typing import Dict
 
 from survey.questions import SURVEY
+from survey.schema import SCHEMA
 
 
 PROJECT_TITLE_UZ = "Kichik va o’rta biznesni moliyalashtirishni takomillashtirish"
 PROJECT_TITLE_RU = "Совершенствование финансирования малого и среднего бизнеса"
 
 
-SECTION_RU = [
-    ("I", 0, 4, "Характеристика респондента"),
-    ("II", 5, 9, "Потребность в кредите и использование"),
-    ("III", 10, 14, "Основные проблемы кредитования"),
-    ("IV", 15, 19, "Институциональные и системные вопросы"),
-    ("V", 20, 24, "Решения и предложения"),
-    ("VI", 25, 29, "Итоговая оценка"),
-]
-
-SECTION_UZ = [
-    ("I", 0, 4, "Respondentlarning tavsifi"),
-    ("II", 5, 9, "Kreditga ehtiyoj va foydalanish"),
-    ("III", 10, 14, "Kreditlashdagi asosiy muammolar"),
-    ("IV", 15, 19, "Institutsional va tizimli muammolar"),
-    ("V", 20, 24, "Yechimlar va takliflar"),
-    ("VI", 25, 29, "Yakuniy baholash"),
-]
-
-
-def _sections(lang: str):
-    return SECTION_RU if lang == "ru" else SECTION_UZ
-
-
 def _section_title(lang: str, q_index0: int) -> str:
-    for roman, a, b, title in _sections(lang):
-        if a <= q_index0 <= b:
-            return f"{roman}. {title}"
-    return ""
+    return SCHEMA.section_title(q_index0, lang) or ""
 
 
 def _q_text(q, lang: str) -> str:
@@ -4,10 +4,13 @@ from collections import Counter
 from typing import Dict
 
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 
-from survey.questions import SURVEY, SECTION_TITLES
+from survey.questions import SURVEY
+from survey.schema import SCHEMA
 
 
 THIN = Side(style="thin", color="D0D7E2")
@@ -27,6 +30,13 @@ FONT_H = Font(bold=True, size=10, color="FFFFFF")
 FONT_CELL = Font(size=10, color="111827")
 
 
+def _tmp_xlsx_path() -> str:
+    # уникальное имя: параллельные выгрузки не пишут в один файл
+    fd, path = tempfile.mkstemp(prefix="survey_stats_", suffix=".xlsx")
+    os.close(fd)
+    return path
+
+
 def autosize_columns(ws, min_w=10, max_w=70):
     for col in ws.columns:
         max_len = 0
@@ -38,11 +48,7 @@ def autosize_columns(ws, min_w=10, max_w=70):
 
 
 def _section_title_for_qnum(q_num: int, lang: str) -> str:
-    last = None
-    for start_q, titles in SECTION_TITLES.items():
-        if q_num >= start_q:
-            last = titles.get(lang)
-    return last or ""
+    return SCHEMA.section_title(q_num - 1, lang) or ""
 
 
 def _fmt_percent(x: float) -> str:
@@ -129,8 +135,8 @@ def _create_dashboard_top(ws, totals: Counter, stats: Dict[str, Dict[str, Counte
             add_section_header(current_section)
 
         counter = stats.get("all", {}).get(q.key, Counter())
-        q_text = q.text_ru if lang == "ru" else q.text_uz
-        opts = q.options_ru if lang == "ru" else q.options_uz
+        q_text = SCHEMA.text(i, lang)
+        opts = SCHEMA.options(i, lang)
 
         if counter:
             top_idx, top_cnt = counter.most_common(1)[0]
@@ -171,7 +177,7 @@ def _create_full_sheet_simple(wb: Workbook, title: str, lang_key: str, stats: Di
     for i, q in enumerate(SURVEY):
         q_num = i + 1
         counter = stats.get(lang_key, {}).get(q.key, Counter())
-        max_opts = max(len(q.options_ru), len(q.options_uz))
+        max_opts = SCHEMA.n_options[i]
 
         for idx in range(max_opts):
             opt_ru = q.options_ru[idx] if idx < len(q.options_ru) else ""
@@ -264,7 +270,7 @@ def _create_all_pretty(wb: Workbook, totals: Counter, stats: Dict[str, Dict[str,
         answered = sum(counter.values())
         denom_q = max(answered, 1)
 
-        max_opts = max(len(q.options_ru), len(q.options_uz))
+        max_opts = SCHEMA.n_options[i]
         for idx in range(max_opts):
             opt_ru = q.options_ru[idx] if idx < len(q.options_ru) else ""
             opt_uz = q.options_uz[idx] if idx < len(q.options_uz) else ""
@@ -312,7 +318,216 @@ def build_excel_stats(totals: Counter, stats: Dict[str, Dict[str, Counter]]) ->
 
     _create_all_pretty(wb, totals, stats)
 
-    tmp_dir = tempfile.gettempdir()
-    path = os.path.join(tmp_dir, "survey_stats.xlsx")
+    path = _tmp_xlsx_path()
+    wb.save(path)
+    return path
+
+
+# ---------- STREAMING (write-only) ----------
+# Тот же отчёт, но через write-only листы: строки уходят в файл сразу,
+# стили — заранее зарегистрированные NamedStyle (без стилизации по ячейке).
+
+_ALIGN_CENTER = Alignment(horizontal="center", vertical="center")
+_ALIGN_LEFT = Alignment(horizontal="left", vertical="center")
+_ALIGN_RIGHT = Alignment(horizontal="right", vertical="center")
+_ALIGN_VCENTER = Alignment(vertical="center")
+_FONT_BOLD = Font(bold=True, size=10, color="111827")
+
+# имя -> (fill, font, alignment, border)
+_STYLE_SPECS = {
+    "x_title": (FILL_DARK, FONT_TITLE, _ALIGN_CENTER, True),
+    "x_title_nb": (FILL_DARK, FONT_TITLE, _ALIGN_CENTER, False),
+    "x_sub": (FILL_LIGHT, FONT_SUB, _ALIGN_CENTER, True),
+    "x_sub_nb": (FILL_LIGHT, FONT_SUB, _ALIGN_CENTER, False),
+    "x_section": (FILL_SECTION, FONT_SEC, _ALIGN_LEFT, True),
+    "x_section_nb": (FILL_SECTION, FONT_SEC, _ALIGN_LEFT, False),
+    "x_question_nb": (FILL_Q, FONT_Q, _ALIGN_LEFT, False),
+    "x_header": (FILL_DARK, FONT_H, _ALIGN_CENTER, True),
+    "x_cell": (None, FONT_CELL, _ALIGN_VCENTER, True),
+    "x_cell_stripe": (FILL_STRIPE, FONT_CELL, _ALIGN_VCENTER, True),
+    "x_answered_label": (None, _FONT_BOLD, _ALIGN_RIGHT, True),
+    "x_answered_value": (None, _FONT_BOLD, _ALIGN_CENTER, True),
+    "x_border": (None, None, None, True),
+}
+
+
+def _register_styles(wb: Workbook):
+    for name, (fill, font, align, border) in _STYLE_SPECS.items():
+        style = NamedStyle(name=name)
+        if fill:
+            style.fill = fill
+        style.font = font or DEFAULT_FONT
+        if align:
+            style.alignment = align
+        style.border = BORDER if border else Border()
+        wb.add_named_style(style)
+
+
+class _SheetStream:
+    """Пишет строки в write-only лист и помнит номер текущей строки."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.row_idx = 0
+
+    def row(self, values, styles, height=None) -> int:
+        """values/styles — по колонкам; style None -> ячейка без стиля."""
+        self.row_idx += 1
+        if height:
+            self.ws.row_dimensions[self.row_idx].height = height
+
+        values = list(values) + [None] * (len(styles) - len(values))
+        cells = []
+        for value, style in zip(values, styles):
+            cell = WriteOnlyCell(self.ws, value=value)
+            if style:
+                cell.style = style
+            cells.append(cell)
+        self.ws.append(cells)
+        return self.row_idx
+
+    def merge(self, row_idx: int, last_col: str, first_col: str = "A"):
+        self.ws.merged_cells.add(f"{first_col}{row_idx}:{last_col}{row_idx}")
+
+
+def _stream_dashboard_top(wb: Workbook, totals: Counter, stats: Dict[str, Dict[str, Counter]], lang: str):
+    title = "DASHBOARD_TOP" if lang == "ru" else "DASHBOARD_TOP_UZ"
+    ws = wb.create_sheet(title)
+    out = _SheetStream(ws)
+
+    for col, width in zip("ABCDEF", (6, 60, 38, 10, 10, 10)):
+        ws.column_dimensions[col].width = width
+
+    total_all = int(totals.get("all", 0))
+    total_ru = int(totals.get("ru", 0))
+    total_uz = int(totals.get("uz", 0))
+    border6 = ["x_border"] * 6
+
+    r = out.row(
+        ["Результаты (TOP) | I–VI (Q1–Q30) [RU]" if lang == "ru" else "Natijalar (TOP) | I–VI (Q1–Q30) [UZ]"],
+        ["x_title"] + border6[1:],
+        height=28,
+    )
+    out.merge(r, "F")
+
+    r = out.row(
+        [
+            f"Total: {total_all} | RU: {total_ru} | UZ: {total_uz} | Share % from total respondents"
+            if lang == "ru"
+            else f"Jami: {total_all} | RU: {total_ru} | UZ: {total_uz} | Ulush % (jami respondentlardan)"
+        ],
+        ["x_sub"] + border6[1:],
+        height=18,
+    )
+    out.merge(r, "F")
+
+    out.row([], border6)
+
+    headers = (
+        ["Q#", "Question (RU)", "Top option (RU)", "Count", "Share %", "Type"]
+        if lang == "ru"
+        else ["Q#", "Savol (UZ)", "Top javob (UZ)", "Soni", "Ulush %", "Turi"]
+    )
+    denom = max(total_all, 1)
+    current_section = None
+
+    for i, q in enumerate(SURVEY):
+        q_num = i + 1
+
+        sec = _section_title_for_qnum(q_num, lang)
+        if sec != current_section:
+            current_section = sec
+            r = out.row([current_section], ["x_section"] + border6[1:], height=18)
+            out.merge(r, "F")
+            out.row(headers, ["x_header"] * 6, height=18)
+
+        counter = stats.get("all", {}).get(q.key, Counter())
+        q_text = SCHEMA.text(i, lang)
+        opts = SCHEMA.options(i, lang)
+
+        if counter:
+            top_idx, top_cnt = counter.most_common(1)[0]
+            top_opt = opts[top_idx] if top_idx < len(opts) else f"option[{top_idx}]"
+            share_str = _fmt_percent((top_cnt / denom) * 100)
+            cnt_val = int(top_cnt)
+        else:
+            top_opt = ""
+            share_str = _fmt_percent(0.0)
+            cnt_val = 0
+
+        style = "x_cell_stripe" if (q_num % 2) == 0 else "x_cell"
+        out.row([q_num, q_text, top_opt, cnt_val, share_str, "single"], [style] * 6)
+
+
+def _stream_all_pretty(wb: Workbook, totals: Counter, stats: Dict[str, Dict[str, Counter]]):
+    ws = wb.create_sheet("ALL_PRETTY")
+    out = _SheetStream(ws)
+
+    for col, width in zip("ABCDE", (6, 40, 40, 10, 10)):
+        ws.column_dimensions[col].width = width
+
+    total_all = int(totals.get("all", 0))
+
+    r = out.row(["Результаты | I–VI (Q1–Q30)"], ["x_title_nb"], height=28)
+    out.merge(r, "E")
+
+    r = out.row(
+        [f"Total respondents: {total_all} | Percentages per question are calculated from answered count of that question"],
+        ["x_sub_nb"],
+        height=18,
+    )
+    out.merge(r, "E")
+
+    out.row([], [])
+
+    current_section = None
+
+    for i, q in enumerate(SURVEY):
+        q_num = i + 1
+
+        sec_ru = _section_title_for_qnum(q_num, "ru")
+        sec_uz = _section_title_for_qnum(q_num, "uz")
+        sec_mix = f"{sec_uz} / {sec_ru}"
+
+        if sec_mix != current_section:
+            current_section = sec_mix
+            r = out.row([sec_mix], ["x_section_nb"], height=18)
+            out.merge(r, "E")
+
+        r = out.row([f"{q_num}) {q.text_ru}  |  {q.text_uz}"], ["x_question_nb"], height=18)
+        out.merge(r, "E")
+        out.row(["№", "Option (RU)", "Option (UZ)", "Count", "Share %"], ["x_header"] * 5, height=18)
+
+        counter = stats.get("all", {}).get(q.key, Counter())
+        answered = sum(counter.values())
+        denom_q = max(answered, 1)
+
+        max_opts = SCHEMA.n_options[i]
+        for idx in range(max_opts):
+            opt_ru = q.options_ru[idx] if idx < len(q.options_ru) else ""
+            opt_uz = q.options_uz[idx] if idx < len(q.options_uz) else ""
+            cnt = int(counter.get(idx, 0))
+            share = (cnt / denom_q) * 100 if answered else 0.0
+
+            style = "x_cell_stripe" if (idx % 2) == 1 else "x_cell"
+            out.row([idx + 1, opt_ru, opt_uz, cnt, _fmt_percent(share)], [style] * 5)
+
+        r = out.row(
+            ["Answered (total for this question):", None, None, answered, ""],
+            ["x_answered_label", None, None, "x_answered_value", "x_border"],
+        )
+        out.merge(r, "C")
+        out.row([], [])
+
+
+def build_excel_stats_stream(totals: Counter, stats: Dict[str, Dict[str, Counter]]) -> str:
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+
+    _stream_dashboard_top(wb, totals, stats, lang="ru")
+    _stream_dashboard_top(wb, totals, stats, lang="uz")
+    _stream_all_pretty(wb, totals, stats)
+
+    path = _tmp_xlsx_path()
     wb.save(path)
     return path
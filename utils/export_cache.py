@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, Hashable
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "survey_exports")
+
+
+class ExportCache:
+    """
+    Кэш готовых файлов выгрузки.
+
+    Ключ — (водяной знак submissions, вид выгрузки, язык): пока новых анкет нет,
+    повторная выгрузка отдаёт уже собранный файл. Одновременные запросы с одним
+    ключом ждут одну сборку (single-flight). Старые файлы удаляются: храним не больше
+    max_items и не дольше ttl секунд. Файлы, отданные меньше grace секунд назад,
+    не трогаем — их может ещё отправлять другой хендлер.
+    """
+
+    def __init__(self, directory: str = EXPORT_DIR, max_items: int = 16, ttl: int = 24 * 3600, grace: int = 600):
+        self.directory = directory
+        self.max_items = max(1, max_items)
+        self.ttl = ttl
+        self.grace = grace
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def path_for(self, key: Hashable, suffix: str) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, f"export_{digest}{suffix}")
+
+    async def get_or_build(self, key: Hashable, suffix: str, build: Callable[[], Awaitable[str]]) -> str:
+        """
+        build() собирает файл во временный путь и возвращает его;
+        кэш переносит файл к себе. Возвращённый путь удалять нельзя.
+        """
+        path = self.path_for(key, suffix)
+        while True:
+            if os.path.exists(path):
+                # mtime = время последней выдачи, по нему работает grace в evict()
+                os.utime(path)
+                return path
+
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                # отменили того, кто собирал, а не нас — пробуем собрать сами
+                if fut.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            tmp_path = await build()
+            os.makedirs(self.directory, exist_ok=True)
+            os.replace(tmp_path, path)
+            os.utime(path)
+            self.evict(keep=path)
+            fut.set_result(path)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            # чтобы исключение не считалось «непрочитанным», если ждущих нет
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        return path
+
+    def evict(self, keep: str | None = None):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+
+        files = []
+        for name in names:
+            if not name.startswith("export_"):
+                continue
+            p = os.path.join(self.directory, name)
+            try:
+                files.append((os.path.getmtime(p), p))
+            except OSError:
+                pass
+
+        files.sort(reverse=True)
+        now = time.time()
+        for i, (mtime, p) in enumerate(files):
+            if p == keep or now - mtime < self.grace:
+                continue
+            if i >= self.max_items or now - mtime > self.ttl:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
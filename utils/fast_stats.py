@@ -0,0 +1,136 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy — необязательная зависимость
+    np = None
+
+from db.codec import V2, decode_answers
+from survey.questions import SURVEY
+
+HAS_NUMPY = np is not None
+
+MISSING = -1
+# больше этого значения индекс варианта в матрицу не кладём (int16 и размер bincount)
+_MAX_OPT = 1024
+
+_KEYS = [q.key for q in SURVEY]
+_N_Q = len(_KEYS)
+_V2_LEN = 1 + (_N_Q + 1) // 2
+
+
+def _empty_stats():
+    return Counter(), defaultdict(lambda: defaultdict(Counter))
+
+
+def answers_matrix(responses: List[Tuple[str, Dict[str, Any]]]):
+    """
+    responses -> (langs, matrix, extras)
+    matrix: int16 [респонденты × вопросы], MISSING там, где ответа нет;
+    extras: (lang, key, opt) для значений, которые не влезли в матрицу (старые list-ответы).
+    """
+    langs = [lang for lang, _ in responses]
+    rows = []
+    extras = []
+
+    for lang, answers in responses:
+        row = []
+        for key in _KEYS:
+            val = answers.get(key)
+            if type(val) is int and 0 <= val < _MAX_OPT:
+                row.append(val)
+                continue
+
+            row.append(MISSING)
+            # совместимость со старыми ответами, где сохранялся list
+            if isinstance(val, list):
+                extras.extend((lang, key, opt) for opt in val if isinstance(opt, int))
+            elif isinstance(val, int):
+                extras.append((lang, key, val))
+        rows.append(row)
+
+    matrix = np.array(rows, dtype=np.int16).reshape(len(rows), _N_Q)
+    return langs, matrix, extras
+
+
+def _v2_matrix(blobs: List[bytes]):
+    # nibble-формат codec v2: старшие 4 бита — чётный вопрос, младшие — нечётный
+    raw = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), _V2_LEN)[:, 1:]
+    matrix = np.empty((len(blobs), raw.shape[1] * 2), dtype=np.int16)
+    matrix[:, 0::2] = raw >> 4
+    matrix[:, 1::2] = raw & 0x0F
+    matrix = matrix[:, :_N_Q]
+    matrix[matrix == 0x0F] = MISSING
+    return matrix
+
+
+def count_matrix(langs: List[str], matrix, extras: Iterable[Tuple[str, str, int]] = ()):
+    """Считает (totals, stats) в форме compute_stats одним bincount на всю матрицу."""
+    totals, stats = _empty_stats()
+    if matrix.shape[0] == 0 and not extras:
+        return totals, stats
+
+    lang_names = sorted(set(langs))
+    lang_pos = {lang: i for i, lang in enumerate(lang_names)}
+    lang_ids = np.array([lang_pos[lang] for lang in langs], dtype=np.int64)
+
+    for lang_id, cnt in enumerate(np.bincount(lang_ids, minlength=len(lang_names))):
+        if cnt:
+            totals["all"] += int(cnt)
+            totals[lang_names[lang_id]] += int(cnt)
+
+    if matrix.size:
+        n_opts = int(matrix.max()) + 1
+        if n_opts > 0:
+            q_ids = np.broadcast_to(np.arange(_N_Q, dtype=np.int64), matrix.shape)
+            l_ids = np.broadcast_to(lang_ids[:, None], matrix.shape)
+            mask = matrix >= 0
+
+            flat = (l_ids[mask] * _N_Q + q_ids[mask]) * n_opts + matrix[mask]
+            counts = np.bincount(flat, minlength=len(lang_names) * _N_Q * n_opts)
+            counts = counts.reshape(len(lang_names), _N_Q, n_opts)
+
+            for lang_id, q_idx, opt_idx in zip(*np.nonzero(counts)):
+                cnt = int(counts[lang_id, q_idx, opt_idx])
+                key = _KEYS[q_idx]
+                stats["all"][key][int(opt_idx)] += cnt
+                stats[lang_names[lang_id]][key][int(opt_idx)] += cnt
+
+    for lang, key, opt in extras:
+        stats["all"][key][opt] += 1
+        stats[lang][key][opt] += 1
+
+    return totals, stats
+
+
+def compute_stats_np(responses: List[Tuple[str, Dict[str, Any]]]):
+    """То же, что handlers.admin.compute_stats, но через матрицу NumPy."""
+    langs, matrix, extras = answers_matrix(responses)
+    return count_matrix(langs, matrix, extras)
+
+
+def compute_stats_rows(rows: Iterable[Tuple[str, Any]]):
+    """
+    Статистика прямо по сырым строкам submissions (lang, answers_json):
+    бинарные v2-строки декодируются векторно, остальное — через decode_answers.
+    """
+    v2_langs, v2_blobs = [], []
+    other: List[Tuple[str, Dict[str, Any]]] = []
+
+    for lang, value in rows:
+        if isinstance(value, bytes) and len(value) == _V2_LEN and value[0] == V2:
+            v2_langs.append(lang)
+            v2_blobs.append(value)
+            continue
+        try:
+            other.append((lang, decode_answers(value)))
+        except Exception:
+            pass
+
+    langs, matrix, extras = answers_matrix(other)
+    if v2_blobs:
+        langs = v2_langs + langs
+        matrix = np.concatenate([_v2_matrix(v2_blobs), matrix])
+
+    return count_matrix(langs, matrix, extras)
@@ -1,2 +1,8 @@
 from .long_text import send_long_text
-from .excel import build_excel_stats
+from .excel import build_excel_stats, build_excel_stats_stream
+from .jobs import JobPool, JobQueueFull, configure_jobs, get_jobs, shutdown_jobs
+from .outbound import OutboundScheduler, bulk, get_outbound, install_outbound
+from .render_fingerprint import RenderFingerprints, render_fingerprint
+from .metrics import ApiMetricsMiddleware, HandlerMetricsMiddleware, render as render_metrics, start_metrics_server
+from .profiling import ProfilingMiddleware, configure_profiling, get_profiler
+from .signals import cancel_on_sigterm
@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from utils.metrics import gauge
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobPool:
+    """
+    Пул для тяжёлой синхронной работы (статистика, Excel), чтобы не блокировать
+    event loop. Одновременно выполняется workers задач, ещё max_queue ждут;
+    сверх этого run() сразу бросает JobQueueFull.
+    """
+
+    def __init__(self, kind: str = "process", workers: int = 1, max_queue: int = 4):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, max_queue)
+        self._executor: Executor | None = None
+        self._slots = asyncio.Semaphore(self.capacity)
+        self.submitted = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        """Сколько задач сейчас в работе или в очереди."""
+        return self.submitted
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        if self._slots.locked():
+            raise JobQueueFull(f"job queue is full ({self.capacity})")
+
+        async with self._slots:
+            self.submitted += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+            finally:
+                self.submitted -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: JobPool | None = None
+
+
+def configure_jobs(kind: str = "process", workers: int = 1, max_queue: int = 4) -> JobPool:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+    _pool = JobPool(kind, workers, max_queue)
+    return _pool
+
+
+def get_jobs() -> JobPool:
+    global _pool
+    if _pool is None:
+        _pool = JobPool()
+    return _pool
+
+
+def shutdown_jobs():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+gauge("bot_job_pool_pending", "Admin jobs running or queued", lambda: _pool.pending if _pool is not None else None)
@@ -0,0 +1,250 @@
+"""
+Метрики процесса в текстовом формате Prometheus: счётчики, гистограммы и
+gauge-функции. Всё в памяти одного процесса, без внешних зависимостей.
+
+    API_CALLS.inc(method="sendMessage")
+    with DB_SECONDS.time(op="load_progress"): ...
+    render()  # текст для /metrics
+"""
+import functools
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from aiohttp import web
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+# по умолчанию: от 1 мс до 10 с
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, doc: str):
+        self.name = name
+        self.doc = doc
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_key(labels), 0.0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [счётчики по корзинам..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _key(labels)
+        row = self._values.get(key)
+        if row is None:
+            row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                row[i] += 1
+                break
+        row[-2] += value
+        row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels) -> int:
+        row = self._values.get(_key(labels))
+        return int(row[-1]) if row else 0
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(self._values.items()):
+            cumulative = 0.0
+            for bound, cnt in zip(self.buckets, row):
+                cumulative += cnt
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, [('le', _fmt_value(bound))])} {_fmt_value(cumulative)}")
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, [('le', '+Inf')])} {_fmt_value(row[-1])}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(row[-2])}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {_fmt_value(row[-1])}")
+        return lines
+
+
+class Gauge:
+    """Значение читается в момент render() из функции (глубина очереди, размер буфера...)."""
+
+    def __init__(self, name: str, doc: str, fn: Callable[[], float | None]):
+        self.name = name
+        self.doc = doc
+        self.fn = fn
+
+    def collect(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            value = None
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} gauge", f"{self.name} {_fmt_value(value)}"]
+
+
+_registry: Dict[str, Counter | Histogram | Gauge] = {}
+
+
+def counter(name: str, doc: str) -> Counter:
+    return _registry.setdefault(name, Counter(name, doc))
+
+
+def histogram(name: str, doc: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _registry.setdefault(name, Histogram(name, doc, buckets))
+
+
+def gauge(name: str, doc: str, fn: Callable[[], float | None]) -> Gauge:
+    # gauge можно перерегистрировать (новый бот/пул после рестарта в тестах)
+    _registry[name] = Gauge(name, doc, fn)
+    return _registry[name]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry.values():
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# --- метрики бота ---
+
+HANDLER_SECONDS = histogram("bot_handler_seconds", "Update handling time by handler")
+HANDLER_ERRORS = counter("bot_handler_errors_total", "Handler exceptions by handler")
+DB_SECONDS = histogram("bot_db_seconds", "Database call time by operation")
+DB_LOCK_WAIT = histogram("bot_db_write_lock_wait_seconds", "Time spent waiting for the SQLite writer")
+API_CALLS = counter("bot_api_calls_total", "Bot API calls by method")
+API_ERRORS = counter("bot_api_errors_total", "Failed Bot API calls by method and error")
+API_SECONDS = histogram("bot_api_seconds", "Bot API call time by method")
+EDIT_FALLBACKS = counter("bot_question_edit_fallbacks_total", "Question edits that fell back to delete+send")
+STATS_SECONDS = histogram(
+    "bot_stats_build_seconds",
+    "Admin stats/export build time by kind",
+    (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+
+def db_timed(fn: Callable[..., Awaitable[Any]]):
+    """Декоратор для async-функций db.repo: время и число вызовов в bot_db_seconds{op=...}."""
+    op = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            DB_SECONDS.observe(time.perf_counter() - t0, op=op)
+
+    return wrapper
+
+
+def _handler_name(data: Dict[str, Any]) -> str:
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    return getattr(callback, "__name__", "unknown")
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Время и ошибки хендлеров (вешается на dp.message / dp.callback_query)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        name = _handler_name(data)
+        t0 = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(handler=name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - t0, handler=name)
+
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Счётчики и время вызовов Bot API (вешается на bot.session)."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        API_CALLS.inc(method=api_method)
+        t0 = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            API_ERRORS.inc(method=api_method, error=type(e).__name__)
+            raise
+        finally:
+            API_SECONDS.observe(time.perf_counter() - t0, method=api_method)
+
+
+async def _metrics_view(_request: web.Request) -> web.Response:
+    return web.Response(
+        body=render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Отдельный маленький HTTP-сервер с GET /metrics (для Prometheus)."""
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_view)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
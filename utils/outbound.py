@@ -0,0 +1,268 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from utils.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+# чем меньше, тем раньше: правки экрана респондента > обычные отправки > рассылки
+PRIORITY_EDIT = 0
+PRIORITY_SEND = 1
+PRIORITY_BULK = 2
+
+_PRIORITY_NAMES = {PRIORITY_EDIT: "edit", PRIORITY_SEND: "send", PRIORITY_BULK: "bulk"}
+
+# под лимиты Telegram попадают только методы, которые что-то пишут в чат
+_LIMITED_PREFIXES = ("send", "edit", "copy", "forward")
+_UNLIMITED = {"sendChatAction"}
+
+_bulk = contextvars.ContextVar("outbound_bulk", default=False)
+
+OUTBOUND_RETRIES = counter("bot_outbound_retries_total", "Outbound requests retried after 429 by method")
+
+
+@contextlib.contextmanager
+def bulk():
+    """Запросы внутри блока идут с низким приоритетом (рассылки)."""
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+class _Bucket:
+    """Token bucket; tokens уходят в минус — это уже зарезервированные слоты."""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp", "blocked_until")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def reserve(self) -> float:
+        """Занимает слот и возвращает, сколько секунд до него ждать."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def available(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= 1
+
+    def wait_time(self) -> float:
+        self._refill(time.monotonic())
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self):
+        self.tokens -= 1
+
+    def penalize(self, seconds: float):
+        # 429: ближайшие seconds секунд слотов нет
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def penalty(self) -> float:
+        """Сколько ещё длится пауза после 429 (без учёта обычных слотов)."""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: все исходящие send*/edit* проходят через лимиты
+    Telegram — на чат (chat_rate/сек, пачкой до chat_burst) и общий (global_rate/сек).
+    Общий лимит раздаётся по приоритету: edit* раньше send*, рассылки (bulk()) последними.
+    Правки экрана респондента (edit* вне bulk()) лимит чата не ждут, если
+    chat_limit_edits=False: иначе после пачки тапов каждый ответ ждёт до 1/chat_rate сек.
+    На 429 ждём retry_after и повторяем (до max_retries раз).
+    Остальные методы (answerCallbackQuery, getMe, ...) идут без ожидания.
+
+        bot.session.middleware(OutboundScheduler())
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 5.0,
+        max_retries: int = 3,
+        max_chats: int = 10000,
+        chat_limit_edits: bool = False,
+    ):
+        self.chat_rate = chat_rate
+        self.chat_burst = max(1.0, chat_burst)
+        self.chat_limit_edits = chat_limit_edits
+        self.max_retries = max_retries
+        self.max_chats = max(1, max_chats)
+
+        # общий лимит без пачек: слоты ровно через 1/global_rate секунды
+        self._global = _Bucket(global_rate, 1.0)
+        self._chats: "OrderedDict[Any, _Bucket]" = OrderedDict()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump: asyncio.Task | None = None
+
+        # метрики
+        self.waiting: Dict[int, int] = {p: 0 for p in _PRIORITY_NAMES}
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+
+    # --- метрики ---
+
+    @property
+    def depth(self) -> int:
+        """Сколько запросов сейчас ждут своей очереди."""
+        return sum(self.waiting.values())
+
+    def stats(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {f"waiting_{name}": self.waiting[p] for p, name in _PRIORITY_NAMES.items()}
+        data.update(
+            depth=self.depth,
+            sent=self.sent,
+            retried=self.retried,
+            failed=self.failed,
+            wait_seconds=round(self.wait_seconds, 3),
+            chats=len(self._chats),
+        )
+        return data
+
+    # --- лимиты ---
+
+    def _chat_bucket(self, chat_id: Any) -> _Bucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = _Bucket(self.chat_rate, self.chat_burst)
+            if len(self._chats) > self.max_chats:
+                # выкидываем самый давний чат; полный bucket ничего не помнит, его не жалко
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def _acquire_global(self, priority: int):
+        if not self._waiters and self._global.available():
+            self._global.take()
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_pump())
+        await fut
+
+    async def _run_pump(self):
+        # раздаёт общие слоты ожидающим строго по приоритету, затем по порядку прихода
+        while self._waiters:
+            delay = self._global.wait_time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():  # ожидающий отменён
+                continue
+            self._global.take()
+            fut.set_result(None)
+
+    async def _acquire(self, chat_id: Any, priority: int):
+        t0 = time.monotonic()
+        self.waiting[priority] += 1
+        try:
+            if chat_id is not None:
+                bucket = self._chat_bucket(chat_id)
+                if priority == PRIORITY_EDIT and not self.chat_limit_edits:
+                    # слот чата не тратим, но паузу после 429 в этом чате соблюдаем
+                    delay = bucket.penalty()
+                else:
+                    delay = bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self._acquire_global(priority)
+        finally:
+            self.waiting[priority] -= 1
+            self.wait_seconds += time.monotonic() - t0
+
+    # --- middleware ---
+
+    @staticmethod
+    def _priority(api_method: str) -> int:
+        if _bulk.get():
+            return PRIORITY_BULK
+        return PRIORITY_EDIT if api_method.startswith("edit") else PRIORITY_SEND
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        if api_method in _UNLIMITED or not api_method.startswith(_LIMITED_PREFIXES):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        priority = self._priority(api_method)
+
+        attempt = 0
+        while True:
+            await self._acquire(chat_id, priority)
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.failed += 1
+                    raise
+                attempt += 1
+                self.retried += 1
+                OUTBOUND_RETRIES.inc(method=api_method)
+                logger.warning("%s: flood control, retry in %ss (chat %s)", api_method, e.retry_after, chat_id)
+                if chat_id is not None:
+                    self._chat_bucket(chat_id).penalize(e.retry_after)
+                else:
+                    self._global.penalize(e.retry_after)
+                continue
+            self.sent += 1
+            return response
+
+
+_scheduler: OutboundScheduler | None = None
+
+
+def install_outbound(bot: Bot, **kwargs) -> OutboundScheduler:
+    """Вешает OutboundScheduler на сессию бота; get_outbound() вернёт его же."""
+    global _scheduler
+    _scheduler = OutboundScheduler(**kwargs)
+    bot.session.middleware(_scheduler)
+    return _scheduler
+
+
+def get_outbound() -> OutboundScheduler | None:
+    return _scheduler
+
+
+gauge("bot_outbound_queue_depth", "Outbound requests waiting for a rate-limit slot",
+      lambda: _scheduler.depth if _scheduler is not None else None)
@@ -0,0 +1,129 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """
+    Выборочный cProfile вокруг обработки апдейта: каждый every-й апдейт
+    и/или все апдейты пользователя user_id. Профили копятся в одну pstats.Stats,
+    report() отдаёт top-N функций, dump() пишет тот же отчёт в файл.
+
+    Выключенный (every=0, user_id=0) стоит одну проверку на апдейт.
+    Профилируется весь поток, поэтому в сэмпл попадают и чужие корутины,
+    которые работали, пока хендлер ждал await; одновременно снимается
+    только один сэмпл.
+    """
+
+    def __init__(self, every: int = 0, user_id: int = 0, top: int = 25, dump_path: str = "", dump_every: int = 20):
+        self.every = max(0, every)
+        self.user_id = user_id
+        self.top = max(1, top)
+        self.dump_path = dump_path
+        self.dump_every = max(1, dump_every)
+
+        self.seen = 0
+        self.samples = 0
+        self.sampled_seconds = 0.0
+        self._stats: pstats.Stats | None = None
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.every or self.user_id)
+
+    def configure(self, every: int | None = None, user_id: int | None = None):
+        if every is not None:
+            self.every = max(0, every)
+        if user_id is not None:
+            self.user_id = user_id
+
+    def reset(self):
+        self.samples = 0
+        self.sampled_seconds = 0.0
+        self._stats = None
+
+    def _should_sample(self, data: Dict[str, Any]) -> bool:
+        if self._active:
+            return False
+        user: User | None = data.get("event_from_user")
+        if self.user_id and user is not None and user.id == self.user_id:
+            return True
+        if self.every:
+            self.seen += 1
+            return self.seen % self.every == 0
+        return False
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not self.enabled or not self._should_sample(data):
+            return await handler(event, data)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        t0 = time.perf_counter()
+        profiler.enable()
+        try:
+            return await handler(event, data)
+        finally:
+            profiler.disable()
+            self._active = False
+            self._collect(profiler, time.perf_counter() - t0)
+
+    def _collect(self, profiler: cProfile.Profile, elapsed: float):
+        self.samples += 1
+        self.sampled_seconds += elapsed
+        if self._stats is None:
+            self._stats = pstats.Stats(profiler)
+        else:
+            self._stats.add(profiler)
+
+        if self.dump_path and self.samples % self.dump_every == 0:
+            try:
+                self.dump()
+            except OSError:
+                logger.exception("profile dump failed")
+
+    def report(self, top: int | None = None, sort: str = "cumulative") -> str:
+        if self._stats is None:
+            return "profile: no samples yet"
+
+        out = io.StringIO()
+        self._stats.stream = out
+        # без путей к файлам — чтобы отчёт влезал в сообщение
+        self._stats.strip_dirs().sort_stats(sort).print_stats(top or self.top)
+        header = (
+            f"profile: {self.samples} samples, {self.sampled_seconds * 1000:.1f} ms total, "
+            f"every={self.every} user_id={self.user_id or '-'}\n"
+        )
+        return header + out.getvalue()
+
+    def dump(self, path: str | None = None):
+        path = path or self.dump_path
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+
+
+_profiler: ProfilingMiddleware | None = None
+
+
+def configure_profiling(every: int = 0, user_id: int = 0, top: int = 25, dump_path: str = "") -> ProfilingMiddleware:
+    global _profiler
+    _profiler = ProfilingMiddleware(every=every, user_id=user_id, top=top, dump_path=dump_path)
+    return _profiler
+
+
+def get_profiler() -> ProfilingMiddleware | None:
+    return _profiler
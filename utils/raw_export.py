@@ -0,0 +1,156 @@
+import csv
+import os
+import tempfile
+from typing import Any, Dict, List
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from db.codec import decode_answers
+from db.repo import iter_submissions
+from survey.questions import SURVEY
+from survey.schema import SCHEMA
+from utils.excel import FILL_DARK, FONT_H, BORDER
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow — необязательная зависимость (только для parquet)
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+
+def raw_header(lang: str) -> List[str]:
+    first = ["#", "Vaqt", "Til"] if lang == "uz" else ["#", "Время", "Язык"]
+    return first + [f"Q{i + 1}" for i in range(len(SURVEY))]
+
+
+def _label(opts: List[str], idx: Any) -> str:
+    if isinstance(idx, int) and 0 <= idx < len(opts):
+        return opts[idx]
+    return f"option[{idx}]"
+
+
+def decode_row(n: int, created_at: str, resp_lang: str, answers: Dict[str, Any], lang: str) -> List[Any]:
+    """Одна анкета -> строка выгрузки с текстами вариантов на языке lang (анонимно, без user_id)."""
+    row: List[Any] = [n, created_at, resp_lang]
+    for i, q in enumerate(SURVEY):
+        opts = SCHEMA.options(i, lang)
+        val = answers.get(q.key)
+        if val is None:
+            row.append("")
+        elif isinstance(val, list):
+            row.append("; ".join(_label(opts, i) for i in val))
+        else:
+            row.append(_label(opts, val))
+    return row
+
+
+def _iter_decoded(db_path: str, lang: str, chunk_size: int):
+    n = 0
+    for chunk in iter_submissions(db_path, chunk_size):
+        out = []
+        for created_at, resp_lang, answers_json in chunk:
+            try:
+                answers = decode_answers(answers_json)
+            except Exception:
+                continue
+            n += 1
+            out.append(decode_row(n, created_at, resp_lang, answers, lang))
+        yield out
+
+
+def _tmp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="survey_raw_", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def column_widths(rows, min_w=10, max_w=70):
+    """Ширины колонок по исходным строкам (аналог autosize_columns без обхода листа)."""
+    widths = []
+    for row in rows:
+        for i, v in enumerate(row):
+            n = len("" if v is None else str(v))
+            if i >= len(widths):
+                widths.append(0)
+            widths[i] = max(widths[i], n)
+    return [min(max(min_w, w + 2), max_w) for w in widths]
+
+
+def _export_xlsx(db_path: str, lang: str, chunk_size: int) -> str:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("RAW")
+
+    # ширины считаем по заголовку и текстам вариантов, а не по данным
+    header = raw_header(lang)
+    longest = ["", "0000-00-00 00:00:00", "uz"] + [
+        max(SCHEMA.options(i, lang), key=len, default="") for i in range(SCHEMA.size)
+    ]
+    for i, width in enumerate(column_widths([header, longest], max_w=50), 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    ws.freeze_panes = "D2"
+
+    head_cells = []
+    for value in header:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.fill = FILL_DARK
+        cell.font = FONT_H
+        cell.border = BORDER
+        head_cells.append(cell)
+    ws.append(head_cells)
+
+    for rows in _iter_decoded(db_path, lang, chunk_size):
+        for row in rows:
+            ws.append(row)
+
+    path = _tmp_path(".xlsx")
+    wb.save(path)
+    return path
+
+
+def _export_csv(db_path: str, lang: str, chunk_size: int) -> str:
+    path = _tmp_path(".csv")
+    # utf-8-sig — чтобы Excel сразу открыл кириллицу
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(raw_header(lang))
+        for rows in _iter_decoded(db_path, lang, chunk_size):
+            writer.writerows(rows)
+    return path
+
+
+def _export_parquet(db_path: str, lang: str, chunk_size: int) -> str:
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+
+    header = raw_header(lang)
+    schema = pa.schema(
+        [pa.field(header[0], pa.int64()), pa.field(header[1], pa.string()), pa.field(header[2], pa.string())]
+        + [pa.field(name, pa.string()) for name in header[3:]]
+    )
+
+    path = _tmp_path(".parquet")
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in _iter_decoded(db_path, lang, chunk_size):
+            if not rows:
+                continue
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays([list(c) for c in columns], schema=schema))
+    return path
+
+
+def export_raw(db_path: str, fmt: str = "xlsx", lang: str = "uz", chunk_size: int = 1000) -> str:
+    """
+    Выгрузка «респондент × вопрос» потоково из submissions базы db_path.
+    Синхронная — запускается в пуле задач (get_jobs().run). Возвращает путь
+    к новому временному файлу.
+    """
+    if fmt == "csv":
+        return _export_csv(db_path, lang, chunk_size)
+    if fmt == "parquet":
+        return _export_parquet(db_path, lang, chunk_size)
+    return _export_xlsx(db_path, lang, chunk_size)
@@ -0,0 +1,48 @@
+import hashlib
+from collections import OrderedDict
+from typing import Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+
+def render_fingerprint(text: str, markup: InlineKeyboardMarkup | None) -> bytes:
+    """Короткий хэш того, что увидит пользователь: текст + клавиатура."""
+    h = hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+    if markup is not None:
+        h.update(b"\0")
+        h.update(markup.model_dump_json(exclude_none=True).encode("utf-8"))
+    return h.digest()
+
+
+class RenderFingerprints:
+    """
+    user_id -> (message_id, fingerprint) живого сообщения с вопросом.
+    LRU на max_users записей: вытесненный пользователь просто получит один лишний edit.
+    """
+
+    def __init__(self, max_users: int = 100_000):
+        self.max_users = max(1, max_users)
+        self._items: "OrderedDict[int, Tuple[int, bytes]]" = OrderedDict()
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def same(self, user_id: int, message_id: int, fingerprint: bytes) -> bool:
+        item = self._items.get(user_id)
+        if item is None:
+            return False
+        self._items.move_to_end(user_id)
+        if item == (message_id, fingerprint):
+            self.skipped += 1
+            return True
+        return False
+
+    def remember(self, user_id: int, message_id: int, fingerprint: bytes):
+        self._items[user_id] = (message_id, fingerprint)
+        self._items.move_to_end(user_id)
+        if len(self._items) > self.max_users:
+            self._items.popitem(last=False)
+
+    def forget(self, user_id: int):
+        self._items.pop(user_id, None)
@@ -0,0 +1,14 @@
+import asyncio
+import signal
+
+
+def cancel_on_sigterm():
+    """
+    SIGTERM (systemd, Docker, multiprocessing.terminate) отменяет текущую задачу,
+    чтобы отработали finally/on_cleanup и буферы ушли в БД.
+    """
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except NotImplementedError:  # Windows
+        pass